@@ -129,6 +129,7 @@ TEMPLATES = [
                             'django.contrib.auth.context_processors.auth',
                             'django.contrib.messages.context_processors.messages',
                             'shop.context_processors.categories',
+                            'shop.context_processors.cart',
             ],
         },
     },
@@ -233,6 +234,52 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache. The catalog version and cached prices must be shared between
+# workers, so production should point DJANGO_CACHE_DIR at a writable folder;
+# without it every process keeps its own in-memory cache (the shop.E001
+# system check refuses that with DJANGO_ENV=production).
+CACHE_DIR = os.environ.get('DJANGO_CACHE_DIR', '')
+if CACHE_DIR:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR,
+            'OPTIONS': {
+                # Cards and pages per language add up quickly; the default of
+                # 300 entries would keep culling the catalog version key.
+                'MAX_ENTRIES': int(os.environ.get('DJANGO_CACHE_MAX_ENTRIES', '50000')),
+            },
+        }
+    }
+
+# Cart storage: 'session' (default), 'cookie' — a signed cookie that avoids
+# a django_session write on every cart click — or 'database' — StoredCart
+# rows keyed by a cookie token (see the clear_abandoned_carts command).
+CART_STORAGE = os.environ.get('CART_STORAGE', 'session')
+
+# Render the header cart badge via /cart/summary/ instead of reading the cart
+# on every page, so catalog HTML does not depend on the visitor.
+CART_BADGE_ASYNC = os.environ.get('CART_BADGE_ASYNC', 'False').lower() == 'true'
+
+# Shared full-page cache for catalog pages (home, list, detail, collections,
+# scents). Only active together with CART_BADGE_ASYNC, which keeps those pages
+# free of per-visitor data.
+PAGE_CACHE = os.environ.get('PAGE_CACHE', 'False').lower() == 'true'
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', '600'))
+
+# Serve catalog filtering/sorting/pagination from an in-process snapshot
+# (reloaded when the catalog version changes) instead of per-request queries.
+CATALOG_SNAPSHOT = os.environ.get('CATALOG_SNAPSHOT', 'False').lower() == 'true'
+
+# Catalog search: 'fulltext' (database full-text index, substring fallback)
+# or 'fuzzy' (in-process trigram index over names and categories that folds
+# Ukrainian/Russian/Latin spellings and tolerates typos).
+CATALOG_SEARCH = os.environ.get('CATALOG_SEARCH', 'fulltext')
+
+# Product list pagination: 'page' (numbered pages) or 'cursor' (keyset
+# pagination with "load more", no COUNT query).
+CATALOG_PAGINATION = os.environ.get('CATALOG_PAGINATION', 'page')
+
 # Telegram notifications (optional)
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID', '')
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+# Backends whose data is private to one process (or not stored at all)
+PROCESS_LOCAL_CACHES = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """The catalog version lives in the default cache and must be shared.
+
+    Signal bumps only reach the cache of the worker that handled the edit;
+    with a per-process cache every other worker keeps serving stale prices,
+    option trees, suggestions and snapshots.
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    message = f"The default cache ({backend}) is not shared between worker processes."
+    hint = "Set DJANGO_CACHE_DIR (or configure a shared cache backend) so the catalog version is seen by every worker."
+    if getattr(settings, "IS_PROD", False):
+        return [Error(message, hint=hint, id="shop.E001")]
+    return [Warning(message, hint=hint, id="shop.W001")]
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.db.models import Prefetch
+from django.utils.functional import SimpleLazyObject
+
 from .models import Category, CategoryGroup
+from .services.cart_store import get_cart_store
 
 def categories(request):
     """Context processor to add all categories to every template"""
@@ -9,3 +13,17 @@ def categories(request):
             Prefetch('categories', queryset=Category.objects.order_by('order', 'name'))
         ).all().order_by('order', 'name'),
     }
+
+
+def cart(request):
+    """Header cart badge; read from the stored summary only when rendered.
+
+    With CART_BADGE_ASYNC the cart is not read at all: the badge is filled
+    from /cart/summary/ so catalog pages stay identical for every visitor.
+    """
+    if getattr(settings, 'CART_BADGE_ASYNC', False):
+        return {'cart_count': 0, 'cart_badge_async': True}
+    return {
+        'cart_count': SimpleLazyObject(lambda: get_cart_store(request).summary().count),
+        'cart_badge_async': False,
+    }
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from shop.models import StoredCart
+
+
+class Command(BaseCommand):
+    help = 'Удаляет корзины (CART_STORAGE=database), которые не менялись N дней'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help='Возраст корзины в днях (по умолчанию 30)')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        deleted, _ = StoredCart.objects.filter(updated_at__lt=cutoff).delete()
+        self.stdout.write(self.style.SUCCESS(f'✓ Удалено записей: {deleted}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from shop.services.search_service import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковые документы товаров и полнотекстовый индекс'
+
+    def handle(self, *args, **options):
+        count = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f'✓ Проиндексировано товаров: {count}'))
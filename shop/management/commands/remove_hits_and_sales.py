@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from shop.models import Candle
+from shop.services.catalog_service import bump_catalog_version
 
 class Command(BaseCommand):
     help = 'Убирает флаг "хит продаж" и скидки со всех товаров'
@@ -11,6 +12,8 @@ class Command(BaseCommand):
             is_on_sale=False,
             discount_percent=None
         )
+        # .update() не шлёт сигналы — сбрасываем кэши каталога вручную
+        bump_catalog_version()
         
         self.stdout.write(self.style.SUCCESS(f'✓ Успешно обновлено {updated} товаров'))
         self.stdout.write('✓ Флаг "хит продаж" - удален')
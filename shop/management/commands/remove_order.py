@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from shop.models import Candle
+from shop.services.catalog_service import bump_catalog_version
 
 class Command(BaseCommand):
     help = 'Убирает порядок со всех товаров'
@@ -7,6 +8,8 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         # Обновляем все товары
         updated = Candle.objects.all().update(order=0)
+        # .update() не шлёт сигналы — сбрасываем кэши каталога вручную
+        bump_catalog_version()
         
         self.stdout.write(self.style.SUCCESS(f'✓ Успешно обновлено {updated} товаров'))
         self.stdout.write('✓ Порядок - удален (установлено значение 0 для всех товаров)')
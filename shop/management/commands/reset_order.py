@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from shop.models import Candle
+from shop.services.catalog_service import bump_catalog_version
 
 
 class Command(BaseCommand):
@@ -7,4 +8,6 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         count = Candle.objects.all().update(order=0)
+        # .update() sends no signals, so invalidate catalog caches explicitly
+        bump_catalog_version()
         self.stdout.write(self.style.SUCCESS(f'✓ Updated {count} candles: order set to 0'))
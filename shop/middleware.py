@@ -13,13 +13,15 @@ class ForceDefaultLanguageMiddleware:
         self.get_response = get_response
 
     def __call__(self, request):
-        # check explicit language set in session or cookie
+        # check explicit language set in cookie or session; the cookie is
+        # checked first so returning visitors never load the session here
+        # (an untouched session keeps catalog pages free of Vary: Cookie)
         sess = getattr(request, 'session', None)
         cookie = request.COOKIES.get(getattr(settings, 'LANGUAGE_COOKIE_NAME', 'django_language'))
 
-        has_session_lang = bool(sess and sess.get('django_language'))
+        has_lang = bool(cookie) or bool(sess is not None and sess.get('django_language'))
         set_cookie = False
-        if not has_session_lang and not cookie:
+        if not has_lang:
             # set session language to Ukrainian so LocaleMiddleware uses it
             if sess is not None:
                 try:
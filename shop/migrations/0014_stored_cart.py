@@ -0,0 +1,46 @@
+# Generated by Django 5.2.11 on 2026-10-17 02:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0013_alter_homebanner_options_alter_scentcategory_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredCart',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, unique=True)),
+                ('item_count', models.PositiveIntegerField(default=0)),
+                ('total', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Корзина',
+                'verbose_name_plural': 'Корзины',
+            },
+        ),
+        migrations.CreateModel(
+            name='StoredCartLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=200)),
+                ('qty', models.PositiveIntegerField(default=1)),
+                ('options', models.JSONField(blank=True, default=list)),
+                ('price', models.DecimalField(blank=True, decimal_places=4, max_digits=12, null=True)),
+                ('catalog_version', models.BigIntegerField(blank=True, null=True)),
+                ('candle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='shop.candle')),
+                ('cart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='shop.storedcart')),
+            ],
+            options={
+                'ordering': ['id'],
+                'constraints': [models.UniqueConstraint(fields=('cart', 'key'), name='uniq_stored_cart_line_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.11 on 2026-10-17 02:22
+
+from django.db import DatabaseError, migrations, models, transaction
+
+FTS_TABLE = 'shop_candle_fts'
+FULLTEXT_INDEX = 'shop_candle_search_ft'
+
+
+def build_search_documents(apps, schema_editor):
+    Candle = apps.get_model('shop', 'Candle')
+    CandleCategory = apps.get_model('shop', 'CandleCategory')
+    category_names = {}
+    links = CandleCategory.objects.values_list('candle_id', 'category__name', 'category__name_ru')
+    for candle_id, name, name_ru in links:
+        category_names.setdefault(candle_id, []).extend(n for n in (name, name_ru) if n)
+    for candle in Candle.objects.all():
+        parts = [
+            candle.name,
+            candle.name_ru,
+            *category_names.get(candle.pk, ()),
+            candle.description,
+            candle.description_ru,
+        ]
+        document = '\n'.join(p for p in parts if p)
+        Candle.objects.filter(pk=candle.pk).update(search_document=document)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        statements = [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+            f"USING fts5(document, tokenize='unicode61 remove_diacritics 2')",
+            f'INSERT INTO {FTS_TABLE} (rowid, document) '
+            f"SELECT id, search_document FROM shop_candle WHERE search_document != ''",
+        ]
+    elif connection.vendor == 'mysql':
+        statements = [f'ALTER TABLE shop_candle ADD FULLTEXT INDEX {FULLTEXT_INDEX} (search_document)']
+    else:
+        return
+    # Без индекса поиск работает по-старому (icontains), поэтому ошибка не фатальна
+    try:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    except DatabaseError:
+        pass
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        elif connection.vendor == 'mysql':
+            try:
+                cursor.execute(f'ALTER TABLE shop_candle DROP INDEX {FULLTEXT_INDEX}')
+            except DatabaseError:
+                pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0014_stored_cart'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candle',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-17 02:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0015_candle_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candle',
+            name='sort_priority',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(is_hit=True, is_on_sale=True, then=models.Value(0)), models.When(is_hit=False, is_on_sale=True, then=models.Value(1)), models.When(is_hit=True, is_on_sale=False, then=models.Value(2)), default=models.Value(3)), output_field=models.PositiveSmallIntegerField()),
+        ),
+        migrations.AddIndex(
+            model_name='candle',
+            index=models.Index(fields=['sort_priority', '-id'], name='shop_candle_priority_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candle',
+            index=models.Index(fields=['price', 'id'], name='shop_candle_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candle',
+            index=models.Index(fields=['name', 'id'], name='shop_candle_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='candle',
+            index=models.Index(fields=['is_hit', 'order', '-id'], name='shop_candle_hit_order_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.11 on 2026-10-17 02:30
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0016_candle_sort_priority_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='candle',
+            name='shop_candle_price_idx',
+        ),
+        migrations.AddField(
+            model_name='candle',
+            name='effective_price',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(discount_percent__gt=0, is_on_sale=True, then=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('price'), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount_percent'))), '/', models.Value(100.0)), output_field=models.DecimalField(decimal_places=2, max_digits=10))), default=models.F('price')), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AddIndex(
+            model_name='candle',
+            index=models.Index(fields=['effective_price', 'id'], name='shop_candle_eff_price_idx'),
+        ),
+    ]
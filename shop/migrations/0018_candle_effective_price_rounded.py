@@ -0,0 +1,34 @@
+# Generated by Django 5.2.11 on 2026-10-17 02:57
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0017_candle_effective_price'),
+    ]
+
+    operations = [
+        # Generated columns cannot be altered in place: drop and re-add
+        # (with the index on it) using the rounded expression.
+        migrations.RemoveIndex(
+            model_name='candle',
+            name='shop_candle_eff_price_idx',
+        ),
+        migrations.RemoveField(
+            model_name='candle',
+            name='effective_price',
+        ),
+        migrations.AddField(
+            model_name='candle',
+            name='effective_price',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(discount_percent__gt=0, is_on_sale=True, then=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('price'), '*', models.Value(100))), '*', django.db.models.expressions.CombinedExpression(models.Value(100), '-', models.F('discount_percent'))), '/', models.Value(100.0))), '/', models.Value(100.0)), output_field=models.DecimalField(decimal_places=2, max_digits=10))), default=models.F('price')), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AddIndex(
+            model_name='candle',
+            index=models.Index(fields=['effective_price', 'id'], name='shop_candle_eff_price_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
+from django.db.models.functions import Round
 from django.utils import translation
 from django.core.validators import FileExtensionValidator
 
+from .services.pricing_service import discounted_price as apply_discount
+
 
 class CategoryGroup(models.Model):
     name = models.CharField(max_length=100, unique=True, verbose_name='Название группы (укр)')
@@ -253,13 +256,50 @@ class Candle(models.Model):
         verbose_name='Коллекция по настроению',
     )
 
+    # Названия и описания на обоих языках + названия категорий, для полнотекстового поиска
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    # Порядок каталога по умолчанию: хит со скидкой, скидка, хит, остальные.
+    # Вычисляется базой из is_hit/is_on_sale, поэтому верен и после .update()
+    sort_priority = models.GeneratedField(
+        expression=models.Case(
+            models.When(is_hit=True, is_on_sale=True, then=models.Value(0)),
+            models.When(is_hit=False, is_on_sale=True, then=models.Value(1)),
+            models.When(is_hit=True, is_on_sale=False, then=models.Value(2)),
+            default=models.Value(3),
+        ),
+        output_field=models.PositiveSmallIntegerField(),
+        db_persist=True,
+    )
+
+    # Цена с учётом скидки (та же формула и то же округление до копеек, что в
+    # discounted_price) — для фильтра и сортировки по цене; пересчитывается
+    # базой при любом изменении
+    effective_price = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                is_on_sale=True,
+                discount_percent__gt=0,
+                # считаем в целых копейках: .5 копейки точно представимо и
+                # округляется вверх одинаково в SQLite (REAL) и MySQL (DECIMAL)
+                then=models.ExpressionWrapper(
+                    Round(
+                        Round(models.F('price') * 100)
+                        * (100 - models.F('discount_percent'))
+                        / models.Value(100.0)
+                    )
+                    / models.Value(100.0),
+                    output_field=models.DecimalField(max_digits=10, decimal_places=2),
+                ),
+            ),
+            default=models.F('price'),
+        ),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+
     def discounted_price(self):
-        if self.is_on_sale and self.discount_percent:
-            try:
-                return (self.price * (100 - self.discount_percent)) / 100
-            except Exception:
-                return self.price
-        return self.price
+        return apply_discount(self.price, self.is_on_sale, self.discount_percent)
 
 
     def display_name(self):
@@ -286,6 +326,13 @@ class Candle(models.Model):
 
     class Meta:
         ordering = ['order', '-id']
+        # По одному индексу на каждую сортировку каталога и на выборку хитов главной
+        indexes = [
+            models.Index(fields=['sort_priority', '-id'], name='shop_candle_priority_idx'),
+            models.Index(fields=['effective_price', 'id'], name='shop_candle_eff_price_idx'),
+            models.Index(fields=['name', 'id'], name='shop_candle_name_idx'),
+            models.Index(fields=['is_hit', 'order', '-id'], name='shop_candle_hit_order_idx'),
+        ]
 
 
 class CandleImage(models.Model):
@@ -506,6 +553,46 @@ class OrderItemOption(models.Model):
         return f'{self.option_name}: {self.value_name}'
 
 
+# =================== КОРЗИНА В БАЗЕ ДАННЫХ ===================
+
+class StoredCart(models.Model):
+    """Корзина покупателя в отдельной таблице (CART_STORAGE='database').
+
+    Привязана к покупателю через непрозрачный токен в cookie.
+    """
+    token = models.CharField(max_length=64, unique=True)
+    item_count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=12, decimal_places=4, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Корзина'
+        verbose_name_plural = 'Корзины'
+
+    def __str__(self):
+        return f'Корзина #{self.id} ({self.item_count} шт.)'
+
+
+class StoredCartLine(models.Model):
+    cart = models.ForeignKey(StoredCart, on_delete=models.CASCADE, related_name='lines')
+    key = models.CharField(max_length=200)
+    candle = models.ForeignKey(Candle, on_delete=models.CASCADE, related_name='+')
+    qty = models.PositiveIntegerField(default=1)
+    options = models.JSONField(default=list, blank=True)
+    price = models.DecimalField(max_digits=12, decimal_places=4, null=True, blank=True)
+    catalog_version = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'key'], name='uniq_stored_cart_line_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.key} x {self.qty}'
+
+
 # Удаление файлов изображений при удалении товара
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
@@ -681,3 +768,136 @@ def delete_scent_image(sender, instance, **kwargs):
                 os.remove(instance.image.path)
         except Exception:
             pass
+
+
+# Версия каталога: сбрасывает кэши цен и выборок после правок в админке
+from django.db.models.signals import m2m_changed, post_save
+from .services.catalog_service import bump_catalog_version
+
+CATALOG_MODELS = (
+    Candle,
+    CandleImage,
+    CandleCategory,
+    Category,
+    CategoryGroup,
+    Collection,
+    CollectionItem,
+    ProductOption,
+    ProductOptionValue,
+    HomeBanner,
+    Scent,
+    ScentCategory,
+    ScentCategoryGroup,
+    ScentCategoryLink,
+)
+
+
+def bump_catalog_version_on_change(sender, **kwargs):
+    bump_catalog_version()
+
+
+for _model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_version_on_change, sender=_model, dispatch_uid=f'catalog_version_save_{_model.__name__}')
+    post_delete.connect(bump_catalog_version_on_change, sender=_model, dispatch_uid=f'catalog_version_delete_{_model.__name__}')
+
+
+def bump_catalog_version_on_m2m_change(sender, action, **kwargs):
+    # categories.add()/remove() пишут CandleCategory в обход post_save
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_catalog_version()
+
+
+m2m_changed.connect(bump_catalog_version_on_m2m_change, sender=Candle.categories.through, dispatch_uid='catalog_version_candle_categories')
+
+
+# Поисковый документ товара: пересобирается при изменении товара и его категорий
+def _refresh_search(candle_ids):
+    from .services.search_service import refresh_search_documents
+    refresh_search_documents(candle_ids)
+
+
+@receiver(post_save, sender=Candle, dispatch_uid='search_candle_save')
+def refresh_candle_search_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _refresh_search([instance.pk])
+
+
+@receiver(post_delete, sender=Candle, dispatch_uid='search_candle_delete')
+def remove_candle_search_document(sender, instance, **kwargs):
+    from .services.search_service import remove_from_search_index
+    remove_from_search_index(instance.pk)
+
+
+@receiver(post_save, sender=CandleCategory, dispatch_uid='search_candle_category_save')
+@receiver(post_delete, sender=CandleCategory, dispatch_uid='search_candle_category_delete')
+def refresh_search_on_category_link(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _refresh_search([instance.candle_id])
+
+
+@receiver(m2m_changed, sender=Candle.categories.through, dispatch_uid='search_candle_categories_m2m')
+def refresh_search_on_categories_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance — категория; при clear() связанные товары запоминаются заранее
+        if action == 'pre_clear':
+            instance._search_clear_ids = list(instance.candle_links.values_list('candle_id', flat=True))
+        elif action == 'post_clear':
+            _refresh_search(getattr(instance, '_search_clear_ids', ()))
+        elif action in ('post_add', 'post_remove'):
+            _refresh_search(pk_set or ())
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        _refresh_search([instance.pk])
+
+
+@receiver(post_save, sender=Category, dispatch_uid='search_category_save')
+def refresh_search_on_category_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        _refresh_search(instance.candle_links.values_list('candle_id', flat=True))
+
+
+# Кэш карточек товаров: версия карточки растёт при изменении товара, его фото и опций
+def _bump_cards(candle_ids):
+    from .services.card_service import bump_card_versions
+    bump_card_versions(candle_ids)
+
+
+@receiver(post_save, sender=Candle, dispatch_uid='card_candle_save')
+@receiver(post_delete, sender=Candle, dispatch_uid='card_candle_delete')
+def bump_card_on_candle_change(sender, instance, **kwargs):
+    _bump_cards([instance.pk])
+
+
+@receiver(post_save, sender=CandleImage, dispatch_uid='card_candle_image_save')
+@receiver(post_delete, sender=CandleImage, dispatch_uid='card_candle_image_delete')
+def bump_card_on_image_change(sender, instance, **kwargs):
+    _bump_cards([instance.candle_id])
+
+
+@receiver(post_save, sender=ProductOption, dispatch_uid='card_product_option_save')
+@receiver(post_delete, sender=ProductOption, dispatch_uid='card_product_option_delete')
+def bump_card_on_option_change(sender, instance, **kwargs):
+    _bump_cards([instance.product_id])
+
+
+@receiver(post_save, sender=Collection, dispatch_uid='card_collection_save')
+def bump_cards_on_collection_change(sender, instance, **kwargs):
+    # название коллекции выводится на карточках страницы коллекции
+    _bump_cards(instance.items.values_list('candle_id', flat=True))
+
+
+# Удаление товара каскадом удаляет строки сохранённых корзин — пересчитываем
+# их счётчик и сумму, иначе значок корзины продолжает считать удалённые товары
+from django.db.models.signals import pre_delete
+
+
+@receiver(pre_delete, sender=Candle)
+def remember_stored_carts_of_candle(sender, instance, **kwargs):
+    instance._stored_cart_ids = list(
+        StoredCartLine.objects.filter(candle_id=instance.pk).values_list('cart_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Candle)
+def refresh_stored_carts_of_candle(sender, instance, **kwargs):
+    from .services.cart_store import refresh_stored_cart_totals
+    refresh_stored_cart_totals(getattr(instance, '_stored_cart_ids', ()))
@@ -0,0 +1,97 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import translation
+
+from .services.catalog_service import get_catalog_version
+
+# Query parameters that never change the page (analytics tags)
+IGNORED_QUERY_PREFIXES = ("utm_",)
+IGNORED_QUERY_PARAMS = {"fbclid", "gclid"}
+
+
+def page_cache_enabled() -> bool:
+    # Pages can only be shared when they carry no per-visitor data, which
+    # is what CART_BADGE_ASYNC guarantees (no cart badge, no CSRF token).
+    return getattr(settings, "PAGE_CACHE", False) and getattr(settings, "CART_BADGE_ASYNC", False)
+
+
+def _normalized_query(request) -> str:
+    pairs = sorted(
+        (key, value)
+        for key, values in request.GET.lists()
+        for value in values
+        if value
+        and key not in IGNORED_QUERY_PARAMS
+        and not key.startswith(IGNORED_QUERY_PREFIXES)
+    )
+    return "&".join(f"{key}={value}" for key, value in pairs)
+
+
+def page_cache_key(request) -> str:
+    lang = (translation.get_language() or "uk")[:2]
+    digest = hashlib.md5(f"{request.path}?{_normalized_query(request)}".encode("utf-8")).hexdigest()
+    return f"shop:page:{get_catalog_version()}:{lang}:{digest}"
+
+
+def _is_staff_request(request) -> bool:
+    # Only look at the session when there is one, so plain visitors do not
+    # pay for a session load (and get no Vary: Cookie).
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return False
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_authenticated)
+
+
+def _cached_response(entry, request):
+    if request.headers.get("If-None-Match") == entry["etag"]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+    response["ETag"] = entry["etag"]
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def cache_catalog_page(view):
+    """Serves a catalog page from the shared cache for anonymous GET requests.
+
+    Entries are keyed on path, normalized query string, language and the
+    catalog version; any catalog edit moves the version, so stale pages are
+    never served. Responses carry an ETag and an ``X-Cache`` header
+    (HIT, MISS or BYPASS).
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not page_cache_enabled():
+            return view(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD") or _is_staff_request(request):
+            response = view(request, *args, **kwargs)
+            response["X-Cache"] = "BYPASS"
+            return response
+
+        key = page_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            return _cached_response(entry, request)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming or response.cookies:
+            response["X-Cache"] = "BYPASS"
+            return response
+
+        entry = {
+            "content": response.content,
+            "content_type": response["Content-Type"],
+            "etag": '"%s"' % hashlib.md5(response.content).hexdigest(),
+        }
+        cache.set(key, entry, getattr(settings, "PAGE_CACHE_TIMEOUT", 600))
+        response["ETag"] = entry["etag"]
+        response["X-Cache"] = "MISS"
+        return response
+
+    return wrapper
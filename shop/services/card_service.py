@@ -0,0 +1,96 @@
+import hashlib
+from typing import Iterable, List
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.safestring import mark_safe
+
+from .catalog_service import initial_version
+
+# Rendered product cards, one fragment per (style, candle, language, candle
+# version, card fields). The per-candle version moves on edits to the
+# candle, its images and its options, so editing one product does not
+# re-render every card; the field fingerprint covers changes that send no
+# signals (bulk .update() from management commands).
+CARD_TEMPLATES = {
+    "home": "shop/cards/home_card_{lang}.html",
+    "list": "shop/cards/list_card_{lang}.html",
+    "mood": "shop/cards/mood_card_{lang}.html",
+}
+CARD_CACHE_TIMEOUT = 24 * 60 * 60
+# CandleCard attributes the card templates render
+CARD_FIELDS = (
+    "display_name",
+    "price",
+    "effective_price",
+    "discounted_price",
+    "is_on_sale",
+    "discount_percent",
+    "is_hit",
+    "is_available",
+    "image_url",
+    "has_options",
+    "display_description",
+)
+
+
+def _fingerprint(card) -> str:
+    values = tuple(getattr(card, name, None) for name in CARD_FIELDS)
+    return hashlib.md5(repr(values).encode("utf-8")).hexdigest()[:12]
+
+
+def _version_key(candle_id) -> str:
+    return f"shop:card_version:{candle_id}"
+
+
+def get_card_versions(candle_ids: Iterable[int]):
+    keys = {candle_id: _version_key(candle_id) for candle_id in candle_ids}
+    found = cache.get_many(keys.values())
+    versions = {}
+    missing = {}
+    for candle_id, key in keys.items():
+        if key in found:
+            versions[candle_id] = found[key]
+        else:
+            versions[candle_id] = missing[key] = initial_version()
+    if missing:
+        cache.set_many(missing, None)
+    return versions
+
+
+def bump_card_versions(candle_ids: Iterable[int]) -> None:
+    for candle_id in {pk for pk in candle_ids if pk}:
+        try:
+            cache.incr(_version_key(candle_id))
+        except ValueError:
+            cache.set(_version_key(candle_id), initial_version(), None)
+
+
+def render_candle_cards(candles, style: str, variant="", **context) -> List[str]:
+    """HTML of one card per candle, rendered once and then served from cache.
+
+    ``variant`` must identify any ``context`` the card depends on besides
+    the candle (e.g. the collection shown on mood cards).
+    """
+    candles = list(candles)
+    if not candles:
+        return []
+    lang = (translation.get_language() or "uk")[:2]
+    versions = get_card_versions(c.pk for c in candles)
+    keys = [
+        f"shop:card:{style}{variant}:{lang}:{c.pk}:{versions[c.pk]}:{_fingerprint(c)}" for c in candles
+    ]
+    cached = cache.get_many(keys)
+
+    template_name = CARD_TEMPLATES[style].format(lang=lang)
+    rendered = {}
+    cards = []
+    for candle, key in zip(candles, keys):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = render_to_string(template_name, {"candle": candle, **context})
+        cards.append(mark_safe(html))
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+    return cards
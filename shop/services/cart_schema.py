@@ -0,0 +1,198 @@
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Session layout (version 2):
+#   {"v": 2, "l": [[pk, qty, [[option_id, value_id], ...], price, catalog_version], ...],
+#    "n": item_count, "t": total}
+# Only ids and the stamped unit price are stored; option names are resolved
+# from the database when the cart is rendered. "n" and "t" are refreshed on
+# every save so the header badge can be read without decoding the lines.
+CART_SCHEMA_VERSION = 2
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    if value is None:
+        return None
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _normalize_options(options: Iterable) -> Tuple[Tuple[int, int], ...]:
+    pairs = {}
+    for pair in options:
+        try:
+            opt_id, val_id = int(pair[0]), int(pair[1])
+        except (TypeError, ValueError, IndexError):
+            continue
+        pairs[opt_id] = val_id
+    return tuple(sorted(pairs.items()))
+
+
+class CartLine:
+    __slots__ = ("pk", "qty", "options", "price", "cv")
+
+    def __init__(self, pk: int, qty: int, options: Iterable = (), price: Optional[Decimal] = None, cv: Optional[int] = None):
+        self.pk = pk
+        self.qty = qty
+        self.options = _normalize_options(options)
+        self.price = price
+        self.cv = cv
+
+    @property
+    def key(self) -> str:
+        if not self.options:
+            return str(self.pk)
+        return f"{self.pk}_{'_'.join(f'{opt_id}:{val_id}' for opt_id, val_id in self.options)}"
+
+    def is_priced(self, version: int) -> bool:
+        return self.price is not None and self.cv == version
+
+    def stamp(self, price: Decimal, version: int) -> None:
+        self.price = price
+        self.cv = version
+
+    def copy(self) -> "CartLine":
+        line = CartLine.__new__(CartLine)
+        line.pk, line.qty, line.options, line.price, line.cv = (
+            self.pk, self.qty, self.options, self.price, self.cv
+        )
+        return line
+
+    def to_data(self) -> list:
+        return [
+            self.pk,
+            self.qty,
+            [list(pair) for pair in self.options],
+            str(self.price) if self.price is not None else None,
+            self.cv,
+        ]
+
+    @classmethod
+    def from_data(cls, row) -> Optional["CartLine"]:
+        try:
+            pk, qty, options, price, cv = row
+        except (TypeError, ValueError):
+            return None
+        return cls._build(pk, qty, options or (), price, cv)
+
+    @classmethod
+    def _build(cls, pk, qty, options=(), price=None, cv=None) -> Optional["CartLine"]:
+        pk, qty = _to_int(pk), _to_int(qty)
+        if pk is None or not qty or qty < 1:
+            return None
+        return cls(pk, qty, options, _to_decimal(price), _to_int(cv))
+
+
+class Cart:
+    """Session cart: ordered lines keyed by their cart key."""
+
+    __slots__ = ("lines",)
+
+    def __init__(self, lines: Iterable[CartLine] = ()):
+        self.lines: Dict[str, CartLine] = {}
+        for line in lines:
+            self.put(line)
+
+    def __iter__(self):
+        return iter(self.lines.values())
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __contains__(self, cart_key):
+        return cart_key in self.lines
+
+    def get(self, cart_key: str) -> Optional[CartLine]:
+        return self.lines.get(cart_key)
+
+    def put(self, line: CartLine) -> None:
+        key = line.key
+        existing = self.lines.get(key)
+        if existing is not None and existing is not line:
+            line.qty += existing.qty
+        self.lines[key] = line
+
+    def remove(self, cart_key: str) -> None:
+        self.lines.pop(cart_key, None)
+
+    def count(self) -> int:
+        return sum(line.qty for line in self.lines.values())
+
+    def total(self) -> Optional[Decimal]:
+        """Sum of stamped line prices, or None while some line is unpriced."""
+        total = Decimal("0")
+        for line in self.lines.values():
+            if line.price is None:
+                return None
+            total += line.price * line.qty
+        return total
+
+    def copy(self) -> "Cart":
+        cart = Cart()
+        cart.lines = {key: line.copy() for key, line in self.lines.items()}
+        return cart
+
+    def to_data(self) -> Dict[str, Any]:
+        total = self.total()
+        return {
+            "v": CART_SCHEMA_VERSION,
+            "l": [line.to_data() for line in self.lines.values()],
+            "n": self.count(),
+            "t": str(total) if total is not None else None,
+        }
+
+    @classmethod
+    def from_data(cls, data: Any) -> "Cart":
+        if isinstance(data, Cart):
+            return data
+        if not isinstance(data, dict):
+            return cls()
+        if data.get("v") == CART_SCHEMA_VERSION:
+            rows = data.get("l") or []
+            return cls(line for line in map(CartLine.from_data, rows) if line is not None)
+        return cls._from_legacy(data)
+
+    @classmethod
+    def _from_legacy(cls, data: Dict[str, Any]) -> "Cart":
+        """Upgrades the old ``{key: qty}`` / ``{key: {pk, qty, options, ...}}`` layout."""
+        lines = []
+        for cart_key, item in data.items():
+            if isinstance(item, dict):
+                options = (item.get("options") or {}).items()
+                line = CartLine._build(item.get("pk"), item.get("qty"), options, item.get("price"), item.get("cv"))
+            else:
+                line = CartLine._build(cart_key, item)
+            if line is not None:
+                lines.append(line)
+        return cls(lines)
+
+
+class CartSummary:
+    """Item count and total of a cart, readable without decoding its lines."""
+
+    __slots__ = ("count", "total")
+
+    def __init__(self, count: int = 0, total: Optional[Decimal] = None):
+        self.count = count
+        self.total = total
+
+    @classmethod
+    def of(cls, cart: Cart) -> "CartSummary":
+        return cls(cart.count(), cart.total())
+
+    @classmethod
+    def from_data(cls, data: Any) -> "CartSummary":
+        if isinstance(data, dict) and data.get("v") == CART_SCHEMA_VERSION:
+            count = _to_int(data.get("n"))
+            if count is not None:
+                return cls(count, _to_decimal(data.get("t")))
+        return cls.of(Cart.from_data(data))
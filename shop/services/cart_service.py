@@ -1,85 +1,119 @@
 from decimal import Decimal
-from typing import Any, Dict, Tuple
+from typing import Any, Dict
 
-from ..models import Candle, ProductOption
+from ..models import Candle, ProductOptionValue
+from .cart_schema import Cart, CartLine
+from .catalog_service import get_catalog_version
+from .option_service import get_option_tree
+from .pricing_service import price_lines, unit_price
 
 
-def get_cart_count(cart: Any) -> int:
-    if not isinstance(cart, dict):
-        return 0
-    total = 0
-    for v in cart.values():
-        if isinstance(v, dict):
-            try:
-                total += int(v.get("qty", 0) or 0)
-            except Exception:
-                continue
-        else:
-            try:
-                total += int(v or 0)
-            except Exception:
-                continue
-    return total
+def as_cart(cart: Any) -> Cart:
+    """Returns a private Cart copy of session data (any schema version)."""
+    if isinstance(cart, Cart):
+        return cart.copy()
+    return Cart.from_data(cart)
 
 
-def build_cart_items(cart: Any):
-    items = []
-    total = Decimal("0")
-    for cart_key, cart_item in (cart.items() if isinstance(cart, dict) else []):
-        if isinstance(cart_item, dict):
-            pk = cart_item.get("pk")
-            qty = cart_item.get("qty", 1)
-            price_modifier = Decimal(cart_item.get("price_modifier", "0") or "0")
-            options_display = cart_item.get("options_display", {})
-            selected_options = cart_item.get("options", {})
-        else:
-            pk = cart_key
-            qty = cart_item
-            price_modifier = Decimal("0")
-            options_display = {}
-            selected_options = {}
+class CartSnapshot:
+    """Priced view of a session cart: resolved lines plus their total."""
 
-        try:
-            candle = Candle.objects.get(pk=int(pk))
-            final_price = candle.discounted_price() + price_modifier
-            subtotal = final_price * qty
-            items.append(
-                {
-                    "cart_key": cart_key,
-                    "candle": candle,
-                    "qty": qty,
-                    "price": final_price,
-                    "subtotal": subtotal,
-                    "options_display": options_display,
-                    "selected_options": selected_options,
-                    "price_modifier": price_modifier,
-                }
-            )
-            total += subtotal
-        except Candle.DoesNotExist:
-            continue
-    return items, total
+    __slots__ = ("items", "total")
 
+    def __init__(self, items, total):
+        self.items = items
+        self.total = total
 
-def add_to_cart(cart: Any, candle, qty: int, selected_options: Dict[str, Any]):
-    product_options = (
-        ProductOption.objects.filter(product=candle).prefetch_related("values")
-    )
-    required_options = {opt.id: opt for opt in product_options if opt.is_required}
-    for req_id, req_opt in required_options.items():
-        if str(req_id) not in selected_options or not selected_options[str(req_id)]:
-            return (
-                cart,
-                {
-                    "ok": False,
-                    "error": "missing_required_options",
-                    "message": f"Не выбрана обязательная опция: {req_opt.name}",
+    def __len__(self):
+        return len(self.items)
+
+
+def _load_option_values(lines) -> Dict[int, ProductOptionValue]:
+    value_ids = {val_id for line in lines for _, val_id in line.options}
+    if not value_ids:
+        return {}
+    return ProductOptionValue.objects.select_related("option").in_bulk(value_ids)
+
+
+def _line_option_values(line: CartLine, values: Dict[int, ProductOptionValue]):
+    """Option values selected on a line, or None if any of them is gone."""
+    resolved = []
+    for opt_id, val_id in line.options:
+        value = values.get(val_id)
+        if value is None or value.option_id != opt_id or value.option.product_id != line.pk:
+            return None
+        resolved.append(value)
+    return resolved
+
+
+def _price_cart_lines(lines, version=None):
+    candles = Candle.objects.in_bulk({line.pk for line in lines}) if lines else {}
+    values = _load_option_values(lines)
+    return price_lines(lines, candles, lambda line: _line_option_values(line, values), version)
+
+
+def resolve_cart(cart: Any) -> CartSnapshot:
+    """Prices every cart line, loading all referenced candles in one query.
+
+    Option names are resolved here, in the active language. Lines pointing
+    at removed products or option values are dropped silently.
+    """
+    priced, total, _ = _price_cart_lines(list(Cart.from_data(cart)))
+
+    items = []
+    for p in priced:
+        items.append(
+            {
+                "cart_key": p.line.key,
+                "candle": p.candle,
+                "qty": p.line.qty,
+                "price": p.unit_price,
+                "subtotal": p.subtotal,
+                "options_display": {
+                    v.option.display_name(): v.display_value() for v in p.option_values
                 },
-                400,
+                "selected_options": {str(v.option_id): v.id for v in p.option_values},
+                "option_values": p.option_values,
+                "price_modifier": p.price_modifier,
+            }
+        )
+    return CartSnapshot(items, total)
+
+
+def _reprice_stale_lines(cart: Cart, version: int) -> None:
+    """Re-stamps lines priced under an older catalog version.
+
+    All stale lines are re-priced together; lines whose product or option
+    values no longer exist are dropped from the cart.
+    """
+    stale = [line for line in cart if not line.is_priced(version)]
+    if not stale:
+        return
+    priced, _, dropped = _price_cart_lines(stale, version)
+    for p in priced:
+        p.line.stamp(p.unit_price, version)
+    for line in dropped:
+        cart.remove(line.key)
+
+
+def _error(error: str, message: str) -> Dict[str, Any]:
+    return {"ok": False, "error": error, "message": message}
+
+
+def _add_line(cart: Cart, candle, qty: int, selected_options: Dict[str, Any]):
+    """Adds ``qty`` of a candle to ``cart`` in place.
+
+    Returns ``(line, None)`` on success or ``(None, error_payload)``.
+    """
+    option_tree = get_option_tree(candle.pk)
+    for req_opt in option_tree.required_options():
+        if str(req_opt.id) not in selected_options or not selected_options[str(req_opt.id)]:
+            return None, _error(
+                "missing_required_options",
+                f"Не выбрана обязательная опция: {req_opt.name}",
             )
 
     validated_options = {}
-    total_price_modifier = Decimal("0")
 
     for opt_id_str, val_id in selected_options.items():
         if not val_id:
@@ -89,151 +123,186 @@ def add_to_cart(cart: Any, candle, qty: int, selected_options: Dict[str, Any]):
             opt_id = int(opt_id_str)
             val_id = int(val_id)
         except (ValueError, TypeError):
-            return (
-                cart,
-                {
-                    "ok": False,
-                    "error": "invalid_option_format",
-                    "message": "Некорректный формат опций",
-                },
-                400,
-            )
+            return None, _error("invalid_option_format", "Некорректный формат опций")
 
-        option = product_options.filter(id=opt_id).first()
+        option = option_tree.get_option(opt_id)
         if not option:
-            return (
-                cart,
-                {
-                    "ok": False,
-                    "error": "invalid_option",
-                    "message": f"Опция {opt_id} не принадлежит данному товару",
-                },
-                400,
+            return None, _error(
+                "invalid_option", f"Опция {opt_id} не принадлежит данному товару"
             )
 
-        value = option.values.filter(id=val_id).first()
-        if not value:
-            return (
-                cart,
-                {
-                    "ok": False,
-                    "error": "invalid_value",
-                    "message": f"Значение {val_id} не принадлежит опции {option.name}",
-                },
-                400,
+        if val_id not in option.values:
+            return None, _error(
+                "invalid_value", f"Значение {val_id} не принадлежит опции {option.name}"
             )
 
-        validated_options[opt_id] = {
-            "option": option,
-            "value": value,
-            "option_name": option.display_name(),
-            "value_name": value.display_value(),
-            "price_modifier": value.price_modifier,
-        }
-        total_price_modifier += value.price_modifier
-
-    option_parts = [
-        f"{opt_id}:{val['value'].id}" for opt_id, val in sorted(validated_options.items())
-    ]
-    cart_key = f"{candle.pk}_{'_'.join(option_parts)}" if option_parts else str(candle.pk)
-
-    cart = dict(cart or {})
-    if cart_key not in cart:
-        cart[cart_key] = {
-            "pk": candle.pk,
-            "qty": 0,
-            "options": {str(k): v["value"].id for k, v in validated_options.items()},
-            "options_display": {
-                v["option_name"]: v["value_name"] for v in validated_options.values()
-            },
-            "price_modifier": str(total_price_modifier),
-        }
+        validated_options[opt_id] = val_id
 
-    cart[cart_key]["qty"] += max(1, qty)
+    line = CartLine(candle.pk, 0, validated_options.items())
+    line = cart.get(line.key) or line
+
+    version = get_catalog_version()
+    option_values = [option_tree.get_value(opt_id, val_id) for opt_id, val_id in line.options]
+    line.qty += max(1, qty)
+    line.stamp(unit_price(candle, option_values, version), version)
+    cart.put(line)
+    return line, None
+
+
+def _next_quantity(current_qty: int, action: str, qty: int):
+    """New line quantity for an update action, or None for unknown actions."""
+    if action == "inc":
+        return current_qty + 1
+    if action == "dec":
+        return current_qty - 1 if current_qty > 1 else 0
+    if action == "set":
+        return qty
+    if action == "remove":
+        return 0
+    return None
+
+
+def _cart_total(cart: Cart) -> Decimal:
+    _reprice_stale_lines(cart, get_catalog_version())
+    return sum((line.price * line.qty for line in cart), Decimal("0"))
 
-    total_items = sum(
-        item["qty"] if isinstance(item, dict) else item for item in cart.values()
-    )
+
+def add_to_cart(cart: Any, candle, qty: int, selected_options: Dict[str, Any]):
+    cart = as_cart(cart)
+    line, error = _add_line(cart, candle, qty, selected_options)
+    if error:
+        return cart, error, 400
 
     return (
         cart,
         {
             "ok": True,
-            "items": total_items,
-            "cart_key": cart_key,
-            "final_price": str(candle.discounted_price() + total_price_modifier),
+            "items": cart.count(),
+            "cart_key": line.key,
+            "final_price": str(line.price),
         },
         200,
     )
 
 
 def update_cart(cart: Any, cart_key: str, action: str, qty: int):
-    cart = dict(cart or {})
+    cart = as_cart(cart)
 
-    if cart_key not in cart:
+    line = cart.get(cart_key)
+    if line is None:
         return cart, {"ok": False, "error": "item not found"}, 404
 
-    cart_item = cart[cart_key]
-    if isinstance(cart_item, dict):
-        current_qty = cart_item.get("qty", 0)
-    else:
-        current_qty = cart_item
-
-    if action == "inc":
-        new_qty = current_qty + 1
-    elif action == "dec":
-        new_qty = current_qty - 1 if current_qty > 1 else 0
-    elif action == "set":
-        new_qty = qty
-    elif action == "remove":
-        new_qty = 0
-    else:
+    new_qty = _next_quantity(line.qty, action, qty)
+    if new_qty is None:
         return cart, {"ok": False, "error": "unknown action"}, 400
 
     if new_qty > 0:
-        if isinstance(cart_item, dict):
-            cart[cart_key]["qty"] = new_qty
-        else:
-            cart[cart_key] = new_qty
+        line.qty = new_qty
     else:
-        cart.pop(cart_key, None)
-
-    items_total = sum(
-        item["qty"] if isinstance(item, dict) else item for item in cart.values()
-    )
+        cart.remove(cart_key)
 
-    total = Decimal("0")
+    total = _cart_total(cart)
     item_subtotal = Decimal("0")
-
-    for key, item in cart.items():
-        try:
-            if isinstance(item, dict):
-                pk = item.get("pk")
-                item_qty = item.get("qty", 1)
-                price_mod = Decimal(item.get("price_modifier", "0") or "0")
-            else:
-                pk = key
-                item_qty = item
-                price_mod = Decimal("0")
-
-            c = Candle.objects.get(pk=int(pk))
-            item_price = c.discounted_price() + price_mod
-
-            if key == cart_key:
-                item_subtotal = item_price * (new_qty if new_qty > 0 else 0)
-
-            total += item_price * item_qty
-        except Candle.DoesNotExist:
-            continue
+    if new_qty > 0 and cart_key in cart:
+        item_subtotal = line.price * new_qty
 
     return (
         cart,
         {
             "ok": True,
-            "items": items_total,
+            "items": cart.count(),
             "item_qty": new_qty if new_qty > 0 else 0,
             "item_subtotal": str(item_subtotal),
             "total": str(total),
         },
         200,
     )
+
+
+MAX_BATCH_OPERATIONS = 50
+
+
+def apply_cart_batch(cart: Any, operations: Any):
+    """Applies a list of add/set/remove operations all-or-nothing.
+
+    Each operation is a dict: ``{"op": "add", "pk": 1, "qty": 1, "options": {}}``,
+    ``{"op": "set", "key": "1", "qty": 3}`` or ``{"op": "remove", "key": "1"}``.
+    On the first failing operation the original cart is returned untouched
+    together with the error and the operation index. The cart is priced
+    once, after all operations are applied.
+    """
+    original = Cart.from_data(cart)
+    if not isinstance(operations, list) or not operations:
+        return original, {"ok": False, "error": "invalid payload"}, 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return original, {"ok": False, "error": "too_many_operations"}, 400
+
+    add_pks = set()
+    for op in operations:
+        if isinstance(op, dict) and op.get("op") == "add":
+            try:
+                add_pks.add(int(op.get("pk")))
+            except (TypeError, ValueError):
+                pass
+    candles = Candle.objects.in_bulk(add_pks) if add_pks else {}
+
+    cart = as_cart(original)
+    for index, op in enumerate(operations):
+        error, status = _apply_batch_operation(cart, op, candles)
+        if error:
+            return original, {**error, "index": index}, status
+
+    total = _cart_total(cart)
+    return (
+        cart,
+        {
+            "ok": True,
+            "items": cart.count(),
+            "total": str(total),
+            "lines": {
+                line.key: {"qty": line.qty, "subtotal": str(line.price * line.qty)}
+                for line in cart
+            },
+        },
+        200,
+    )
+
+
+def _apply_batch_operation(cart: Cart, op: Any, candles):
+    """Applies one batch operation in place; returns ``(error_payload, status)``."""
+    if not isinstance(op, dict):
+        return {"ok": False, "error": "invalid payload"}, 400
+    kind = op.get("op")
+    try:
+        qty = int(op.get("qty", 1))
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "invalid payload"}, 400
+
+    if kind == "add":
+        try:
+            candle = candles.get(int(op.get("pk")))
+        except (TypeError, ValueError):
+            return {"ok": False, "error": "invalid payload"}, 400
+        if candle is None:
+            return {"ok": False, "error": "not_found"}, 404
+        if not candle.is_available:
+            return _error("out_of_stock", "Товара нет в наличии"), 400
+        options = op.get("options") or {}
+        if not isinstance(options, dict):
+            return _error("invalid_option_format", "Некорректный формат опций"), 400
+        _, error = _add_line(cart, candle, qty, options)
+        return error, 400
+
+    if kind in ("set", "remove"):
+        cart_key = str(op.get("key"))
+        line = cart.get(cart_key)
+        if line is None:
+            return {"ok": False, "error": "item not found"}, 404
+        new_qty = _next_quantity(line.qty, kind, qty)
+        if new_qty > 0:
+            line.qty = new_qty
+        else:
+            cart.remove(cart_key)
+        return None, 200
+
+    return {"ok": False, "error": "unknown action"}, 400
@@ -0,0 +1,289 @@
+import secrets
+from decimal import Decimal
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.utils import timezone
+
+from ..models import StoredCart, StoredCartLine
+from .cart_schema import Cart, CartLine, CartSummary
+
+CART_SESSION_KEY = "cart"
+CART_COOKIE_SALT = "shop.cart"
+
+
+class CartStoreFull(Exception):
+    """The encoded cart does not fit into the storage backend."""
+
+
+class SessionCartStore:
+    """Keeps the cart in ``request.session`` (the default)."""
+
+    def __init__(self, request):
+        self.request = request
+        self._cart = None
+
+    def load(self) -> Cart:
+        if self._cart is None:
+            self._cart = Cart.from_data(self.request.session.get(CART_SESSION_KEY))
+        return self._cart
+
+    def summary(self) -> CartSummary:
+        if self._cart is not None:
+            return CartSummary.of(self._cart)
+        return CartSummary.from_data(self.request.session.get(CART_SESSION_KEY))
+
+    def save(self, cart: Cart, response) -> None:
+        self.request.session[CART_SESSION_KEY] = cart.to_data()
+        self._cart = cart
+
+    def clear(self, response) -> None:
+        self.save(Cart(), response)
+
+
+class CookieCartStore:
+    """Keeps the cart in a signed, size-bounded cookie; no session writes."""
+
+    def __init__(self, request):
+        self.request = request
+        self._cart = None
+        self.cookie_name = getattr(settings, "CART_COOKIE_NAME", "cart")
+        self.max_age = getattr(settings, "CART_COOKIE_AGE", 30 * 24 * 60 * 60)
+        self.max_bytes = getattr(settings, "CART_COOKIE_MAX_BYTES", 3800)
+
+    def _read_data(self):
+        value = self.request.COOKIES.get(self.cookie_name)
+        if not value:
+            return None
+        try:
+            return signing.loads(value, salt=CART_COOKIE_SALT, max_age=self.max_age)
+        except signing.BadSignature:
+            return None
+
+    def load(self) -> Cart:
+        if self._cart is None:
+            self._cart = Cart.from_data(self._read_data())
+        return self._cart
+
+    def summary(self) -> CartSummary:
+        if self._cart is not None:
+            return CartSummary.of(self._cart)
+        return CartSummary.from_data(self._read_data())
+
+    def save(self, cart: Cart, response) -> None:
+        if not cart:
+            self.clear(response)
+            return
+        value = signing.dumps(cart.to_data(), salt=CART_COOKIE_SALT, compress=True)
+        if len(value) > self.max_bytes:
+            raise CartStoreFull(len(value))
+        response.set_cookie(
+            self.cookie_name,
+            value,
+            max_age=self.max_age,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+        self._cart = cart
+
+    def clear(self, response) -> None:
+        response.delete_cookie(self.cookie_name, samesite="Lax")
+        self._cart = Cart()
+
+
+CENTS = Decimal("0.01")
+
+
+def _trim_price(price):
+    # The column keeps 4 decimal places for discounted prices; drop the
+    # padding so totals print the same as with the other stores.
+    if price is not None and price == price.quantize(CENTS):
+        return price.quantize(CENTS)
+    return price
+
+
+class DatabaseCartStore:
+    """Keeps the cart in StoredCart/StoredCartLine rows keyed by a cookie token.
+
+    Saving diffs the cart against what was loaded, so changing one line's
+    quantity is a single-row UPDATE.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self._cart = None
+        self._loaded = {}
+        self.cookie_name = getattr(settings, "CART_TOKEN_COOKIE_NAME", "cart_token")
+        self.max_age = getattr(settings, "CART_COOKIE_AGE", 30 * 24 * 60 * 60)
+        self.token = request.COOKIES.get(self.cookie_name) or None
+
+    def load(self) -> Cart:
+        if self._cart is None:
+            rows = []
+            if self.token:
+                rows = StoredCartLine.objects.filter(cart__token=self.token).values_list(
+                    "key", "candle_id", "qty", "options", "price", "catalog_version"
+                )
+            lines = []
+            for key, candle_id, qty, options, price, version in rows:
+                line = CartLine(candle_id, qty, options or (), _trim_price(price), version)
+                lines.append(line)
+                self._loaded[line.key] = (key, qty, price, version)
+            self._cart = Cart(lines)
+        return self._cart
+
+    def summary(self) -> CartSummary:
+        if self._cart is not None:
+            return CartSummary.of(self._cart)
+        if not self.token:
+            return CartSummary(0, Decimal("0"))
+        row = StoredCart.objects.filter(token=self.token).values_list("item_count", "total").first()
+        if row is None:
+            return CartSummary(0, Decimal("0"))
+        return CartSummary(row[0], _trim_price(row[1]))
+
+    def save(self, cart: Cart, response) -> None:
+        self.load()
+        with transaction.atomic():
+            stored = self._stored_cart(response)
+            current = {line.key: line for line in cart}
+
+            removed = [self._loaded[key][0] for key in self._loaded if key not in current]
+            if removed:
+                StoredCartLine.objects.filter(cart=stored, key__in=removed).delete()
+
+            new_lines = []
+            for key, line in current.items():
+                loaded = self._loaded.get(key)
+                if loaded is None:
+                    new_lines.append(
+                        StoredCartLine(
+                            cart=stored,
+                            key=key,
+                            candle_id=line.pk,
+                            qty=line.qty,
+                            options=[list(pair) for pair in line.options],
+                            price=line.price,
+                            catalog_version=line.cv,
+                        )
+                    )
+                elif loaded[1:] != (line.qty, line.price, line.cv):
+                    StoredCartLine.objects.filter(cart=stored, key=loaded[0]).update(
+                        qty=line.qty, price=line.price, catalog_version=line.cv
+                    )
+            merged = self._create_lines(new_lines)
+
+            if merged:
+                refresh_stored_cart_totals([stored.pk])
+            else:
+                StoredCart.objects.filter(pk=stored.pk).update(
+                    item_count=cart.count(), total=cart.total(), updated_at=timezone.now()
+                )
+
+        if merged:
+            # another request wrote to this cart meanwhile; read it afresh
+            self._loaded = {}
+            self._cart = None
+            return
+        self._loaded = {key: (key, line.qty, line.price, line.cv) for key, line in current.items()}
+        self._cart = cart
+
+    def _create_lines(self, new_lines) -> bool:
+        """Inserts ``new_lines``; returns True if some were merged instead.
+
+        A concurrent request (a double click on "Купити") may have inserted
+        the same key since this cart was loaded. Those lines are added to
+        the existing row instead of failing on the unique constraint.
+        """
+        if not new_lines:
+            return False
+        try:
+            with transaction.atomic():
+                StoredCartLine.objects.bulk_create(new_lines)
+            return False
+        except IntegrityError:
+            pass
+        for line in new_lines:
+            try:
+                with transaction.atomic():
+                    line.save(force_insert=True)
+            except IntegrityError:
+                StoredCartLine.objects.filter(cart=line.cart, key=line.key).update(
+                    qty=F("qty") + line.qty, price=line.price, catalog_version=line.catalog_version
+                )
+        return True
+
+    def _stored_cart(self, response) -> StoredCart:
+        if self.token:
+            stored = StoredCart.objects.filter(token=self.token).only("pk").first()
+            if stored is not None:
+                return stored
+        self.token = secrets.token_urlsafe(32)
+        self._loaded = {}
+        response.set_cookie(
+            self.cookie_name,
+            self.token,
+            max_age=self.max_age,
+            secure=settings.SESSION_COOKIE_SECURE,
+            httponly=True,
+            samesite="Lax",
+        )
+        return StoredCart.objects.create(token=self.token)
+
+    def clear(self, response) -> None:
+        if self.token:
+            StoredCart.objects.filter(token=self.token).delete()
+        response.delete_cookie(self.cookie_name, samesite="Lax")
+        self.token = None
+        self._loaded = {}
+        self._cart = Cart()
+
+
+def refresh_stored_cart_totals(cart_ids) -> None:
+    """Recomputes item_count/total of stored carts from their remaining lines.
+
+    Needed when lines disappear behind the store's back (a deleted candle
+    cascades to its lines).
+    """
+    cart_ids = set(cart_ids)
+    if not cart_ids:
+        return
+    totals = {
+        row["cart_id"]: row
+        for row in StoredCartLine.objects.filter(cart_id__in=cart_ids)
+        .order_by()
+        .values("cart_id")
+        .annotate(
+            count=Sum("qty"),
+            total=Sum(F("price") * F("qty"), output_field=DecimalField(max_digits=12, decimal_places=4)),
+            unpriced=Count("id", filter=Q(price__isnull=True)),
+        )
+    }
+    for cart_id in cart_ids:
+        row = totals.get(cart_id)
+        if row is None:
+            count, total = 0, Decimal("0")
+        else:
+            # like Cart.total(): unknown while some line is unpriced
+            count, total = row["count"], None if row["unpriced"] else row["total"]
+        StoredCart.objects.filter(pk=cart_id).update(item_count=count, total=total)
+
+
+CART_STORES = {
+    "session": SessionCartStore,
+    "cookie": CookieCartStore,
+    "database": DatabaseCartStore,
+}
+
+
+def get_cart_store(request):
+    """Cart store selected by ``settings.CART_STORAGE``, one per request."""
+    store = getattr(request, "_cart_store", None)
+    if store is None:
+        backend = getattr(settings, "CART_STORAGE", "session")
+        store = CART_STORES[backend](request)
+        request._cart_store = store
+    return store
@@ -0,0 +1,111 @@
+import hashlib
+from typing import Any, Dict
+
+from django.conf import settings
+from django.urls import reverse
+from django.utils import translation
+
+from .catalog_filters import CatalogFilters
+from .catalog_service import get_catalog_version
+
+
+def _etag(*parts) -> str:
+    lang = (translation.get_language() or "uk")[:2]
+    raw = repr((get_catalog_version(), lang) + parts)
+    return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+
+def product_list_etag(request) -> str:
+    """Strong ETag of a product list response.
+
+    Depends only on the catalog version, the language, the filter signature
+    and the page being asked for, so it is computed without touching the
+    catalog; an unchanged catalog answers a revalidation with a 304.
+    """
+    filters = CatalogFilters.from_params(request.GET, search=False)
+    return _etag(
+        "list",
+        filters.signature(),
+        request.GET.get("sort") or "",
+        request.GET.get("page") or "",
+        request.GET.get("cursor") or "",
+        getattr(settings, "CATALOG_PAGINATION", "page"),
+    )
+
+
+def product_detail_etag(request, pk) -> str:
+    return _etag("detail", int(pk))
+
+
+def serialize_card(card) -> Dict[str, Any]:
+    return {
+        "id": card.pk,
+        "name": card.display_name,
+        "price": str(card.price),
+        "effective_price": str(card.effective_price),
+        "is_on_sale": bool(card.is_on_sale and card.discount_percent),
+        "discount_percent": card.discount_percent,
+        "is_hit": card.is_hit,
+        "is_available": card.is_available,
+        "has_options": bool(card.has_options),
+        "image_url": card.image_url,
+        "url": reverse("product_detail", args=[card.pk]),
+    }
+
+
+def product_list_payload(data) -> Dict[str, Any]:
+    """JSON body for ``get_product_list_data`` output."""
+    page_obj = data["page_obj"]
+    if data["cursor_page"] is not None:
+        pagination = {
+            "next_cursor": page_obj.next_cursor,
+            "previous_cursor": page_obj.previous_cursor,
+        }
+    else:
+        pagination = {
+            "page": page_obj.number,
+            "num_pages": data["paginator"].num_pages,
+            "count": data["paginator"].count,
+            "has_next": page_obj.has_next(),
+            "has_previous": page_obj.has_previous(),
+        }
+    facets = data["facets"]
+    return {
+        "ok": True,
+        "results": [serialize_card(card) for card in page_obj],
+        "pagination": pagination,
+        "facets": {
+            "categories": {str(k): v for k, v in facets["categories"].items()},
+            "groups": {str(k): v for k, v in facets["groups"].items()},
+            "collections": facets["collections"],
+            "price_buckets": [
+                {
+                    "min": bucket["min"],
+                    "max": bucket["max"],
+                    "count": bucket["count"],
+                }
+                for bucket in facets["price_buckets"]
+            ],
+        },
+    }
+
+
+def product_detail_payload(candle, data) -> Dict[str, Any]:
+    """JSON body for a candle and its ``get_product_detail_data`` output."""
+    return {
+        "ok": True,
+        "product": {
+            "id": candle.pk,
+            "name": candle.display_name(),
+            "description": candle.display_description(),
+            "price": str(candle.price),
+            "effective_price": str(candle.effective_price),
+            "is_on_sale": bool(candle.is_on_sale and candle.discount_percent),
+            "discount_percent": candle.discount_percent,
+            "is_hit": candle.is_hit,
+            "is_available": candle.is_available,
+            "images": data["images"],
+            "options": data["options_data"],
+            "url": reverse("product_detail", args=[candle.pk]),
+        },
+    }
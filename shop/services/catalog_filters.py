@@ -0,0 +1,155 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Q
+
+from ..models import CandleCategory
+from .search_service import search_candle_ids
+
+
+def _filter_by_substring(qs, q):
+    """Fallback search for databases without a full-text index."""
+    q_cap = q.capitalize()
+    return qs.filter(
+        Q(name__icontains=q)
+        | Q(name_ru__icontains=q)
+        | Q(categories__name__icontains=q)
+        | Q(categories__name_ru__icontains=q)
+        | Q(description__icontains=q)
+        | Q(description_ru__icontains=q)
+        | Q(name__contains=q_cap)
+        | Q(name_ru__contains=q_cap)
+        | Q(categories__name__contains=q_cap)
+        | Q(categories__name_ru__contains=q_cap)
+        | Q(description__contains=q_cap)
+        | Q(description_ru__contains=q_cap)
+    ).distinct()
+
+
+CATEGORY_ANY = "any"
+CATEGORY_ALL = "all"
+
+
+class CatalogFilters:
+    """Listing filters parsed from the query string.
+
+    Invalid values are dropped the same way the listing always did, so the
+    filters here are exactly the ones applied to the queryset. Facets reuse
+    them with one dimension skipped (``skip=("category",)`` etc.).
+
+    ``category`` may repeat: ``category_mode=all`` keeps candles in every
+    listed category, anything else candles in any of them.
+    """
+
+    __slots__ = ("q", "collection", "categories", "category_mode", "group", "min_price", "max_price", "search_ids")
+
+    def __init__(
+        self,
+        q="",
+        collection=None,
+        categories=(),
+        category_mode=CATEGORY_ANY,
+        group=None,
+        min_price=None,
+        max_price=None,
+        search=True,
+    ):
+        self.q = q
+        self.collection = collection
+        self.categories = tuple(sorted(set(categories)))
+        # with a single category both modes are the same filter
+        self.category_mode = CATEGORY_ALL if category_mode == CATEGORY_ALL and len(self.categories) > 1 else CATEGORY_ANY
+        self.group = group
+        self.min_price = min_price
+        self.max_price = max_price
+        # search=False skips the index lookup when only the signature is needed
+        self.search_ids = search_candle_ids(q) if q and search else None
+
+    @classmethod
+    def from_params(cls, params, search=True):
+        def to_int(value):
+            try:
+                return int(value) if value else None
+            except (ValueError, TypeError):
+                return None
+
+        def to_price(value):
+            # Decimal, like the effective_price column: a float bound would
+            # compare differently in the snapshot (Decimal("84.99") <= 84.99
+            # is False)
+            try:
+                price = Decimal(value) if value else None
+            except (InvalidOperation, TypeError):
+                return None
+            return price if price is not None and price.is_finite() else None
+
+        min_price = to_price(params.get("min_price"))
+        max_price = to_price(params.get("max_price"))
+
+        return cls(
+            q=params.get("q", "").strip(),
+            collection=params.get("collection") or None,
+            categories=[pk for pk in map(to_int, params.getlist("category")) if pk is not None],
+            category_mode=params.get("category_mode"),
+            group=to_int(params.get("group")),
+            min_price=min_price,
+            max_price=max_price,
+            search=search,
+        )
+
+    def signature(self, skip=()):
+        """Hashable, normalized description of the applied filters."""
+        values = {
+            "q": " ".join(self.q.lower().split()) or None,
+            "collection": self.collection,
+            "category": (self.category_mode, self.categories) if self.categories else None,
+            "group": self.group,
+            # "50" and "50.0" are the same bound
+            "price": (
+                tuple(None if p is None else p.normalize() for p in (self.min_price, self.max_price))
+                if self.min_price is not None or self.max_price is not None
+                else None
+            ),
+        }
+        return tuple(sorted((k, v) for k, v in values.items() if v is not None and k not in skip))
+
+    def apply(self, qs, skip=()):
+        if self.collection and "collection" not in skip:
+            qs = qs.filter(collection__code=self.collection)
+
+        if self.q and "q" not in skip:
+            if self.search_ids is None:
+                qs = _filter_by_substring(qs, self.q)
+            else:
+                qs = qs.filter(pk__in=self.search_ids)
+
+        # Category filters are id subqueries over CandleCategory rather than
+        # joins, so no DISTINCT over whole candle rows is needed.
+        if self.categories and "category" not in skip:
+            qs = qs.filter(pk__in=self.category_candle_ids())
+
+        if self.group is not None and "group" not in skip:
+            qs = qs.filter(pk__in=CandleCategory.objects.filter(category__group_id=self.group).values("candle_id"))
+
+        if "price" not in skip:
+            if self.min_price is not None:
+                qs = qs.filter(effective_price__gte=self.min_price)
+            if self.max_price is not None:
+                qs = qs.filter(effective_price__lte=self.max_price)
+        return qs
+
+    def category_candle_ids(self):
+        """Subquery of candle ids passing the category filter.
+
+        ``all`` is one ``GROUP BY candle_id HAVING COUNT(*) = n`` (links are
+        unique per candle and category).
+        """
+        links = CandleCategory.objects.filter(category_id__in=self.categories)
+        if self.category_mode == CATEGORY_ANY:
+            return links.values("candle_id")
+        return (
+            links.order_by()
+            .values("candle_id")
+            .annotate(n=Count("id"))
+            .filter(n=len(self.categories))
+            .values("candle_id")
+        )
@@ -0,0 +1,32 @@
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "shop:catalog_version"
+
+
+def initial_version() -> int:
+    """Seed for a version counter kept in the cache.
+
+    A millisecond timestamp, so a cache flush never hands out a version
+    number that is already stamped into some session cart (or card key).
+    """
+    return int(time.time() * 1000)
+
+
+def get_catalog_version() -> int:
+    """Current catalog version; changes whenever catalog data is edited."""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, initial_version(), None)
+        version = cache.get(CATALOG_VERSION_KEY) or initial_version()
+    return version
+
+
+def bump_catalog_version() -> int:
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        version = initial_version()
+        cache.set(CATALOG_VERSION_KEY, version, None)
+        return version
@@ -0,0 +1,170 @@
+import threading
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from ..models import Candle, CandleCategory, ProductOption
+from .catalog_filters import CATEGORY_ALL
+from .catalog_service import get_catalog_version
+
+
+class CandleRecord:
+    """Listing fields of one candle, as loaded into the snapshot."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "order",
+        "price",
+        "effective_price",
+        "sort_priority",
+        "is_hit",
+        "collection_code",
+        "category_ids",
+        "group_ids",
+        "has_options",
+    )
+
+    def __init__(self, id, name, order, price, effective_price, sort_priority, is_hit, collection_code):
+        self.id = id
+        self.name = name
+        self.order = order
+        self.price = price
+        self.effective_price = effective_price
+        self.sort_priority = sort_priority
+        self.is_hit = is_hit
+        self.collection_code = collection_code
+        self.category_ids: FrozenSet[int] = frozenset()
+        self.group_ids: FrozenSet[int] = frozenset()
+        self.has_options = False
+
+
+class CatalogSnapshot:
+    """Read-only in-memory copy of the catalog listing data.
+
+    Built in four queries and never mutated afterwards (sort orders are
+    memoized per ordering tuple), so request threads can share it freely.
+    """
+
+    def __init__(self, version, records: Dict[int, CandleRecord]):
+        self.version = version
+        self.records = records
+        by_category: Dict[int, set] = {}
+        by_group: Dict[int, set] = {}
+        by_collection: Dict[str, set] = {}
+        for record in records.values():
+            for category_id in record.category_ids:
+                by_category.setdefault(category_id, set()).add(record.id)
+            for group_id in record.group_ids:
+                by_group.setdefault(group_id, set()).add(record.id)
+            if record.collection_code:
+                by_collection.setdefault(record.collection_code, set()).add(record.id)
+        self.by_category = {k: frozenset(v) for k, v in by_category.items()}
+        self.by_group = {k: frozenset(v) for k, v in by_group.items()}
+        self.by_collection = {k: frozenset(v) for k, v in by_collection.items()}
+        self._orders: Dict[Tuple[str, ...], Tuple[int, ...]] = {}
+
+    def ordered_ids(self, ordering: Sequence[str]) -> Tuple[int, ...]:
+        """All candle ids in ``ordering`` (e.g. ``("sort_priority", "-id")``)."""
+        ordering = tuple(ordering)
+        ids = self._orders.get(ordering)
+        if ids is None:
+            ids = list(self.records)
+            # stable sorts, least significant field first
+            for order in reversed(ordering):
+                name = order.lstrip("-")
+                ids.sort(key=lambda pk: getattr(self.records[pk], name), reverse=order.startswith("-"))
+            ids = self._orders[ordering] = tuple(ids)
+        return ids
+
+    def known_ids(self, ids) -> List[int]:
+        """``ids`` (in order) that are part of this snapshot."""
+        return [pk for pk in ids if pk in self.records]
+
+    def filter_ids(self, filters, skip=()) -> Optional[FrozenSet[int]]:
+        """Ids matching ``filters`` (a CatalogFilters), or None for "all".
+
+        ``skip`` names filter dimensions to ignore, as in ``CatalogFilters.apply``.
+        """
+        sets: List[Iterable[int]] = []
+        if filters.collection and "collection" not in skip:
+            sets.append(self.by_collection.get(filters.collection, frozenset()))
+        if filters.q and "q" not in skip:
+            # the index may know candles created after this snapshot was built
+            sets.append(self.known_ids(filters.search_ids))
+        if filters.categories and "category" not in skip:
+            members = [self.by_category.get(pk, frozenset()) for pk in filters.categories]
+            if filters.category_mode == CATEGORY_ALL:
+                sets.append(frozenset.intersection(*members))
+            else:
+                sets.append(frozenset().union(*members))
+        if filters.group is not None and "group" not in skip:
+            sets.append(self.by_group.get(filters.group, frozenset()))
+        if (filters.min_price is not None or filters.max_price is not None) and "price" not in skip:
+            low, high = filters.min_price, filters.max_price
+            sets.append(
+                pk
+                for pk, record in self.records.items()
+                if (low is None or record.effective_price >= low)
+                and (high is None or record.effective_price <= high)
+            )
+        if not sets:
+            return None
+        matched = frozenset(sets[0])
+        for ids in sets[1:]:
+            matched &= frozenset(ids)
+        return matched
+
+    def select(self, filters, ordering: Sequence[str], search_ids=None) -> List[int]:
+        """Ids matching ``filters`` in ``ordering`` (or in ``search_ids`` rank order)."""
+        matched = self.filter_ids(filters)
+        order = self.known_ids(search_ids) if search_ids is not None else self.ordered_ids(ordering)
+        if matched is None:
+            return list(order)
+        return [pk for pk in order if pk in matched]
+
+
+def build_catalog_snapshot(version=None) -> CatalogSnapshot:
+    if version is None:
+        version = get_catalog_version()
+    records = {}
+    rows = Candle.objects.order_by().values_list(
+        "id", "name", "order", "price", "effective_price", "sort_priority", "is_hit", "collection__code"
+    )
+    for row in rows:
+        records[row[0]] = CandleRecord(*row)
+
+    categories: Dict[int, set] = {}
+    groups: Dict[int, set] = {}
+    links = CandleCategory.objects.order_by().values_list("candle_id", "category_id", "category__group_id")
+    for candle_id, category_id, group_id in links:
+        categories.setdefault(candle_id, set()).add(category_id)
+        if group_id is not None:
+            groups.setdefault(candle_id, set()).add(group_id)
+
+    with_options = set(
+        ProductOption.objects.filter(product__isnull=False).order_by().values_list("product_id", flat=True).distinct()
+    )
+
+    for pk, record in records.items():
+        record.category_ids = frozenset(categories.get(pk, ()))
+        record.group_ids = frozenset(groups.get(pk, ()))
+        record.has_options = pk in with_options
+    return CatalogSnapshot(version, records)
+
+
+# One snapshot per worker process. A version check per request decides
+# whether it is still current; a rebuilt snapshot replaces the old one in
+# a single assignment, so readers never see a half-built catalog.
+_snapshot: Optional[CatalogSnapshot] = None
+_lock = threading.Lock()
+
+
+def get_catalog_snapshot() -> CatalogSnapshot:
+    global _snapshot
+    version = get_catalog_version()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            snapshot = _snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = _snapshot = build_catalog_snapshot(version)
+    return snapshot
@@ -1,17 +1,22 @@
+from ..models import Candle
+from .card_service import render_candle_cards
+from .listing_service import card_values, to_cards
+
+
 def get_collection_detail_data(collection):
-    items = (
-        collection.items.select_related("candle")
-        .prefetch_related("candle__options")
-        .order_by("order", "id")[:6]
+    candles = to_cards(
+        card_values(
+            Candle.objects.filter(collection_items__collection=collection).order_by(
+                "collection_items__order", "collection_items__id"
+            )[:6],
+            with_description=True,
+        )
     )
 
-    items_with_options_ids = []
-    for item in items:
-        if item.candle.options.exists():
-            items_with_options_ids.append(item.candle.pk)
-
     return {
         "collection": collection,
-        "items": items,
-        "items_with_options_ids": items_with_options_ids,
+        "candles": candles,
+        "cards": render_candle_cards(
+            candles, "mood", variant=f":{collection.pk}", collection=collection
+        ),
     }
@@ -0,0 +1,119 @@
+from typing import Any, List, Optional, Sequence
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = "shop.catalog.cursor"
+
+
+def _field(order: str):
+    """``"-price"`` -> ``("price", True)``."""
+    if order.startswith("-"):
+        return order[1:], True
+    return order, False
+
+
+def _to_json(value):
+    if value is None or isinstance(value, (int, str, bool)):
+        return value
+    return str(value)
+
+
+def _after(ordering: Sequence[str], values: Sequence[Any], reverse: bool = False) -> Q:
+    """Rows strictly after ``values`` in ``ordering`` (before it when ``reverse``).
+
+    Builds ``(a > x) OR (a = x AND b > y) ...`` with each comparison flipped
+    for descending fields.
+    """
+    condition = Q()
+    equal = {}
+    for order, value in zip(ordering, values):
+        name, desc = _field(order)
+        lookup = "lt" if desc != reverse else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+    return condition
+
+
+class CursorPage:
+    """One keyset page; iterable like a Paginator page."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset pagination over a queryset with a unique, total ``ordering``.
+
+    The last ordering field must be unique (``id``). Pages are fetched with
+    ``WHERE (sort key) > (cursor) LIMIT n + 1``, so there is no COUNT query
+    and no OFFSET scan. Cursors are signed and bound to the ordering; a
+    cursor from another sort order is ignored.
+    """
+
+    def __init__(self, queryset, ordering: Sequence[str], per_page: int):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+
+    def _encode(self, obj, direction: str) -> str:
+        values = [_to_json(getattr(obj, _field(order)[0])) for order in self.ordering]
+        return signing.dumps({"o": self.ordering, "v": values, "d": direction}, salt=CURSOR_SALT)
+
+    def _decode(self, cursor: Optional[str]):
+        if not cursor:
+            return None
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None
+        if not isinstance(data, dict) or data.get("o") != self.ordering:
+            return None
+        values = data.get("v")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            return None
+        return values, data.get("d") == "prev"
+
+    def get_page(self, cursor: Optional[str] = None) -> CursorPage:
+        decoded = self._decode(cursor)
+        qs = self.queryset
+        backwards = False
+        if decoded is not None:
+            values, backwards = decoded
+            qs = qs.filter(_after(self.ordering, values, reverse=backwards))
+
+        if backwards:
+            qs = qs.order_by(*[o[1:] if o.startswith("-") else f"-{o}" for o in self.ordering])
+        else:
+            qs = qs.order_by(*self.ordering)
+
+        rows: List = list(qs[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self._encode(rows[-1], "next")
+            if (has_more and backwards) or (decoded is not None and not backwards):
+                previous_cursor = self._encode(rows[0], "prev")
+        return CursorPage(rows, next_cursor, previous_cursor)
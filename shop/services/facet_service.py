@@ -0,0 +1,133 @@
+import hashlib
+from decimal import Decimal
+from typing import Any, Dict
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from ..models import Candle, CandleCategory
+from .catalog_filters import CatalogFilters
+from .catalog_service import get_catalog_version
+
+# Upper edges of the price buckets shown next to the filters (₴); the last
+# bucket is open-ended.
+PRICE_BUCKET_EDGES = (300, 600, 1000)
+FACETS_CACHE_TIMEOUT = 60 * 60
+
+
+def price_buckets():
+    """``[(min_price, max_price), ...]`` as the listing filter applies them."""
+    buckets = []
+    lower = None
+    for edge in PRICE_BUCKET_EDGES:
+        buckets.append((lower, Decimal(edge) - Decimal("0.01")))
+        lower = Decimal(edge)
+    buckets.append((lower, None))
+    return buckets
+
+
+def _grouped_counts(qs, field, count_field="id") -> Dict[Any, int]:
+    rows = (
+        qs.exclude(**{f"{field}__isnull": True})
+        .values(field)
+        .annotate(n=Count(count_field, distinct=True))
+        .order_by()
+        .values_list(field, "n")
+    )
+    return dict(rows)
+
+
+def compute_facets(filters: CatalogFilters) -> Dict[str, Any]:
+    """Counts per category, group, collection and price bucket.
+
+    Each dimension is counted with every other filter applied but its own,
+    so switching to another category shows how many products it would have.
+    One grouped query per dimension.
+    """
+    base = Candle.objects.all()
+
+    category_candles = filters.apply(base, skip=("category", "group")).values("pk")
+    links = CandleCategory.objects.filter(candle_id__in=category_candles)
+
+    collection_qs = filters.apply(base, skip=("collection",))
+
+    buckets = price_buckets()
+    price_qs = filters.apply(base, skip=("price",))
+    bucket_counts = price_qs.aggregate(
+        **{
+            f"b{i}": Count(
+                "id",
+                distinct=True,
+                filter=Q(
+                    **({"effective_price__gte": lo} if lo is not None else {}),
+                    **({"effective_price__lte": hi} if hi is not None else {}),
+                ),
+            )
+            for i, (lo, hi) in enumerate(buckets)
+        }
+    )
+
+    return {
+        "categories": _grouped_counts(links, "category_id", "candle_id"),
+        "groups": _grouped_counts(links, "category__group_id", "candle_id"),
+        "collections": _grouped_counts(collection_qs, "collection__code"),
+        "price_buckets": [
+            {"min": lo, "max": hi, "count": bucket_counts[f"b{i}"]}
+            for i, (lo, hi) in enumerate(buckets)
+        ],
+    }
+
+
+def compute_snapshot_facets(snapshot, filters: CatalogFilters) -> Dict[str, Any]:
+    """Same counts as ``compute_facets``, from the in-memory catalog snapshot."""
+
+    def matching(skip):
+        ids = snapshot.filter_ids(filters, skip)
+        return snapshot.records.keys() if ids is None else ids
+
+    categories: Dict[int, int] = {}
+    groups: Dict[int, int] = {}
+    for pk in matching(("category", "group")):
+        record = snapshot.records[pk]
+        for category_id in record.category_ids:
+            categories[category_id] = categories.get(category_id, 0) + 1
+        for group_id in record.group_ids:
+            groups[group_id] = groups.get(group_id, 0) + 1
+
+    collections: Dict[str, int] = {}
+    for pk in matching(("collection",)):
+        code = snapshot.records[pk].collection_code
+        if code:
+            collections[code] = collections.get(code, 0) + 1
+
+    prices = [snapshot.records[pk].effective_price for pk in matching(("price",))]
+    return {
+        "categories": categories,
+        "groups": groups,
+        "collections": collections,
+        "price_buckets": [
+            {
+                "min": lo,
+                "max": hi,
+                "count": sum(
+                    1 for p in prices if (lo is None or p >= lo) and (hi is None or p <= hi)
+                ),
+            }
+            for lo, hi in price_buckets()
+        ],
+    }
+
+
+def get_catalog_facets(filters: CatalogFilters, snapshot=None) -> Dict[str, Any]:
+    """Cached facets for a filter set, rebuilt after catalog edits.
+
+    With a catalog ``snapshot`` the counts are taken from memory instead of
+    grouped queries.
+    """
+    digest = hashlib.md5(repr(filters.signature()).encode("utf-8")).hexdigest()
+    key = f"shop:facets:{get_catalog_version()}:{digest}"
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute_snapshot_facets(snapshot, filters) if snapshot is not None else compute_facets(filters)
+        cache.set(key, facets, FACETS_CACHE_TIMEOUT)
+    return facets
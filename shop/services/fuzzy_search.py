@@ -0,0 +1,144 @@
+import re
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Set
+
+from ..models import Candle, CandleCategory
+from .catalog_service import get_catalog_version
+
+# A query word matches an indexed word at or above this trigram similarity
+MIN_SIMILARITY = 0.45
+# Matches through a category name rank slightly below matches on the name
+CATEGORY_WEIGHT = 0.9
+PREFIX_SIMILARITY = 0.9
+MAX_PREFIX_WORDS = 200
+
+# Ukrainian and Russian letters folded to one Latin spelling, so "ваніль",
+# "ваниль" and "vanil" all become "vanil".
+_CYRILLIC = {
+    "а": "a", "б": "b", "в": "v", "г": "g", "ґ": "g", "д": "d", "е": "e",
+    "є": "e", "ё": "e", "э": "e", "ж": "zh", "з": "z", "и": "i", "і": "i",
+    "ї": "i", "ы": "i", "й": "i", "к": "k", "л": "l", "м": "m", "н": "n",
+    "о": "o", "п": "p", "р": "r", "с": "s", "т": "t", "у": "u", "ф": "f",
+    "х": "h", "ц": "c", "ч": "ch", "ш": "sh", "щ": "sh", "ь": "", "ъ": "",
+    "ю": "iu", "я": "ia", "'": "", "’": "", "ʼ": "",
+}
+_TRANSLIT = str.maketrans(_CYRILLIC)
+# Common Latin spellings of the same sounds
+_LATIN = [("shch", "sh"), ("sch", "sh"), ("kh", "h"), ("ts", "c"), ("tz", "c"), ("ck", "k"),
+          ("y", "i"), ("j", "i"), ("w", "v"), ("x", "ks"), ("q", "k")]
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_REPEAT_RE = re.compile(r"(.)\1+")
+
+
+def fold_word(word: str) -> str:
+    word = word.casefold().translate(_TRANSLIT)
+    for spelling, replacement in _LATIN:
+        word = word.replace(spelling, replacement)
+    # "ванилль" / "vanill" -> "vanil"
+    return _REPEAT_RE.sub(r"\1", word)
+
+
+def fold_words(text: str) -> List[str]:
+    return [w for w in (fold_word(t) for t in _WORD_RE.findall(text or "")) if w]
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} or {padded}
+
+
+class TrigramIndex:
+    """Folded words of candle and category names with an inverted trigram index."""
+
+    def __init__(self, documents: Dict[int, Dict[str, float]]):
+        # documents: candle id -> {folded word: weight}
+        words: Dict[str, Dict[int, float]] = {}
+        for candle_id, doc_words in documents.items():
+            for word, weight in doc_words.items():
+                candles = words.setdefault(word, {})
+                candles[candle_id] = max(weight, candles.get(candle_id, 0.0))
+        self.words = sorted(words)
+        self.candles = [words[w] for w in self.words]
+        self.grams = [trigrams(w) for w in self.words]
+        self.postings: Dict[str, List[int]] = {}
+        for word_id, grams in enumerate(self.grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(word_id)
+
+    def similar_words(self, word: str) -> Dict[int, float]:
+        """Index word ids similar to ``word``, with their Dice similarity."""
+        grams = trigrams(word)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for word_id in self.postings.get(gram, ()):
+                shared[word_id] = shared.get(word_id, 0) + 1
+        found = {}
+        for word_id, count in shared.items():
+            score = 2.0 * count / (len(grams) + len(self.grams[word_id]))
+            if score >= MIN_SIMILARITY:
+                found[word_id] = score
+        # a started word ("lav") matches the words it begins
+        if len(word) >= 3:
+            i = bisect_left(self.words, word)
+            end = min(len(self.words), i + MAX_PREFIX_WORDS)
+            while i < end and self.words[i].startswith(word):
+                found[i] = max(found.get(i, 0.0), PREFIX_SIMILARITY)
+                i += 1
+        return found
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Candle ids matching every query word, best mean similarity first."""
+        query_words = fold_words(query)
+        if not query_words:
+            return []
+        scores: Dict[int, float] = {}
+        for n, word in enumerate(dict.fromkeys(query_words)):
+            best: Dict[int, float] = {}
+            for word_id, similarity in self.similar_words(word).items():
+                for candle_id, weight in self.candles[word_id].items():
+                    score = similarity * weight
+                    if score > best.get(candle_id, 0.0):
+                        best[candle_id] = score
+            if n == 0:
+                scores = best
+            else:
+                scores = {pk: s + best[pk] for pk, s in scores.items() if pk in best}
+            if not scores:
+                return []
+        ranked = sorted(scores, key=lambda pk: (-scores[pk], -pk))
+        return ranked[:limit]
+
+
+def build_trigram_index() -> TrigramIndex:
+    documents: Dict[int, Dict[str, float]] = {}
+    for pk, name, name_ru in Candle.objects.order_by().values_list("pk", "name", "name_ru"):
+        documents[pk] = {w: 1.0 for w in fold_words(f"{name or ''} {name_ru or ''}")}
+    links = CandleCategory.objects.order_by().values_list("candle_id", "category__name", "category__name_ru")
+    for candle_id, name, name_ru in links:
+        doc_words = documents.setdefault(candle_id, {})
+        for word in fold_words(f"{name or ''} {name_ru or ''}"):
+            doc_words.setdefault(word, CATEGORY_WEIGHT)
+    return TrigramIndex(documents)
+
+
+# One index per worker process, rebuilt on the first search after the
+# catalog version moves.
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def get_trigram_index() -> TrigramIndex:
+    global _index, _index_version
+    version = get_catalog_version()
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = build_trigram_index()
+                _index_version = version
+    return _index
+
+
+def fuzzy_search_ids(query: str, limit: int) -> List[int]:
+    return get_trigram_index().search(query, limit)
@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Substr
+from django.utils import translation
+
+from ..models import Candle, ProductOption
+from .pricing_service import discounted_price
+
+# Columns a product card needs; descriptions and the search document stay in
+# the database.
+CARD_FIELDS = (
+    "id",
+    "name",
+    "name_ru",
+    "price",
+    "effective_price",
+    "is_available",
+    "image",
+    "is_hit",
+    "is_on_sale",
+    "discount_percent",
+)
+# Mood cards show the first words of the description; this much is enough
+SHORT_DESCRIPTION_LENGTH = 200
+
+
+class CandleCard:
+    """Card-sized view of a candle, resolved for the active language."""
+
+    __slots__ = (
+        "pk",
+        "name",
+        "display_name",
+        "price",
+        "effective_price",
+        "discounted_price",
+        "is_available",
+        "image_url",
+        "is_hit",
+        "is_on_sale",
+        "discount_percent",
+        "has_options",
+        "display_description",
+    )
+
+    def __init__(self, row, ru: bool, has_options=None):
+        self.pk = row.id
+        self.name = row.name
+        if ru:
+            self.display_name = row.name_ru or row.name or ""
+        else:
+            self.display_name = row.name or row.name_ru or ""
+        self.price = row.price
+        self.effective_price = row.effective_price
+        self.discounted_price = discounted_price(row.price, row.is_on_sale, row.discount_percent)
+        self.is_available = row.is_available
+        self.image_url = _image_url(row.image)
+        self.is_hit = row.is_hit
+        self.is_on_sale = row.is_on_sale
+        self.discount_percent = row.discount_percent
+        self.has_options = row.has_options if has_options is None else has_options
+        self.display_description = ""
+        if hasattr(row, "short_description"):
+            if ru:
+                self.display_description = row.short_description_ru or row.short_description or ""
+            else:
+                self.display_description = row.short_description or row.short_description_ru or ""
+
+
+_image_storage = Candle._meta.get_field("image").storage
+
+
+def _image_url(name) -> str:
+    if not name:
+        return ""
+    try:
+        return _image_storage.url(name)
+    except Exception:
+        return ""
+
+
+def _is_ru() -> bool:
+    return (translation.get_language() or "").lower().startswith("ru")
+
+
+def card_values(qs, extra: Sequence[str] = (), with_options=True, with_description=False):
+    """``qs`` projected to card columns as named rows (plus ``extra`` columns,
+    e.g. the sort key a cursor needs)."""
+    fields = list(CARD_FIELDS) + [name for name in extra if name not in CARD_FIELDS]
+    if with_options:
+        qs = qs.annotate(has_options=Exists(ProductOption.objects.filter(product_id=OuterRef("pk"))))
+        fields.append("has_options")
+    if with_description:
+        qs = qs.annotate(
+            short_description=Substr("description", 1, SHORT_DESCRIPTION_LENGTH),
+            short_description_ru=Substr("description_ru", 1, SHORT_DESCRIPTION_LENGTH),
+        )
+        fields += ["short_description", "short_description_ru"]
+    return qs.values_list(*fields, named=True)
+
+
+def to_cards(rows: Iterable, has_options: Optional[Dict[int, bool]] = None) -> List[CandleCard]:
+    """CandleCards for rows from ``card_values``; ``has_options`` maps pk to
+    the flag when the rows were loaded without it."""
+    ru = _is_ru()
+    if has_options is None:
+        return [CandleCard(row, ru) for row in rows]
+    return [CandleCard(row, ru, has_options.get(row.id, False)) for row in rows]
+
+
+def cards_for_ids(ids: Sequence[int], has_options: Dict[int, bool]) -> List[CandleCard]:
+    """Cards for ``ids`` in that order (ids no longer in the catalog are skipped)."""
+    rows = {row.id: row for row in card_values(Candle.objects.filter(pk__in=ids).order_by(), with_options=False)}
+    return to_cards([rows[pk] for pk in ids if pk in rows], has_options)
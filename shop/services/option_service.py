@@ -0,0 +1,102 @@
+from decimal import Decimal
+from typing import Dict, Optional
+
+from django.core.cache import cache
+from django.utils import translation
+
+from ..models import ProductOption
+from .catalog_service import get_catalog_version
+
+
+def _is_ru() -> bool:
+    return (translation.get_language() or '').lower().startswith('ru')
+
+
+class OptionValueNode:
+    __slots__ = ("id", "value", "value_ru", "price_modifier")
+
+    def __init__(self, id, value, value_ru, price_modifier):
+        self.id = id
+        self.value = value
+        self.value_ru = value_ru
+        self.price_modifier = price_modifier if price_modifier is not None else Decimal("0")
+
+    def display_value(self):
+        if _is_ru():
+            return self.value_ru or self.value or ''
+        return self.value or self.value_ru or ''
+
+
+class OptionNode:
+    __slots__ = ("id", "name", "name_ru", "is_required", "values")
+
+    def __init__(self, id, name, name_ru, is_required):
+        self.id = id
+        self.name = name
+        self.name_ru = name_ru
+        self.is_required = is_required
+        self.values: Dict[int, OptionValueNode] = {}
+
+    def display_name(self):
+        if _is_ru():
+            return self.name_ru or self.name or ''
+        return self.name or self.name_ru or ''
+
+
+class OptionTree:
+    """Options of a single candle with their values, keyed by id."""
+
+    __slots__ = ("options",)
+
+    def __init__(self, options: Dict[int, OptionNode]):
+        self.options = options
+
+    def __bool__(self):
+        return bool(self.options)
+
+    def required_options(self):
+        return [opt for opt in self.options.values() if opt.is_required]
+
+    def get_option(self, option_id: int) -> Optional[OptionNode]:
+        return self.options.get(option_id)
+
+    def get_value(self, option_id: int, value_id: int) -> Optional[OptionValueNode]:
+        option = self.options.get(option_id)
+        if option is None:
+            return None
+        return option.values.get(value_id)
+
+
+def build_option_tree(candle_pk: int) -> OptionTree:
+    rows = (
+        ProductOption.objects.filter(product_id=candle_pk)
+        .order_by("sort_order", "id", "values__sort_order", "values__id")
+        .values_list(
+            "id",
+            "name",
+            "name_ru",
+            "is_required",
+            "values__id",
+            "values__value",
+            "values__value_ru",
+            "values__price_modifier",
+        )
+    )
+    options: Dict[int, OptionNode] = {}
+    for opt_id, name, name_ru, is_required, val_id, value, value_ru, price_modifier in rows:
+        option = options.get(opt_id)
+        if option is None:
+            option = options[opt_id] = OptionNode(opt_id, name, name_ru, is_required)
+        if val_id is not None:
+            option.values[val_id] = OptionValueNode(val_id, value, value_ru, price_modifier)
+    return OptionTree(options)
+
+
+def get_option_tree(candle_pk: int) -> OptionTree:
+    """Cached option tree for a candle, rebuilt after catalog edits."""
+    key = f"shop:options:{candle_pk}:{get_catalog_version()}"
+    tree = cache.get(key)
+    if tree is None:
+        tree = build_option_tree(candle_pk)
+        cache.set(key, tree, 60 * 60)
+    return tree
@@ -1,4 +1,4 @@
-from ..models import OrderItem, OrderItemOption, ProductOption, ProductOptionValue
+from ..models import OrderItem, OrderItemOption
 
 
 def create_order_with_items(form, items, warehouse: str):
@@ -14,18 +14,17 @@ def create_order_with_items(form, items, warehouse: str):
             price=item["price"],
         )
 
-        for opt_id, val_id in item["selected_options"].items():
-            try:
-                option = ProductOption.objects.get(id=int(opt_id))
-                value = ProductOptionValue.objects.get(id=int(val_id))
-                if val_id:
-                    OrderItemOption.objects.create(
-                        order_item=order_item,
-                        option_name=option.display_name(),
-                        value_name=value.display_value(),
-                        price_modifier=value.price_modifier,
-                    )
-            except (ProductOption.DoesNotExist, ProductOptionValue.DoesNotExist):
-                pass
+        # Option values are already resolved (with their options) by resolve_cart.
+        OrderItemOption.objects.bulk_create(
+            [
+                OrderItemOption(
+                    order_item=order_item,
+                    option_name=value.option.display_name(),
+                    value_name=value.display_value(),
+                    price_modifier=value.price_modifier,
+                )
+                for value in item.get("option_values", ())
+            ]
+        )
 
     return order
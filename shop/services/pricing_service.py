@@ -0,0 +1,100 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Hashable, Iterable, Tuple
+
+from .catalog_service import get_catalog_version
+
+# Unit prices memoized per pricing input: the candle's price, sale flag and
+# discount plus the selected option values and their modifiers. The key is
+# built from the rows the caller just loaded, so a stale catalog version
+# (bulk .update(), another worker's edit) can never return an old price.
+MAX_MEMO_SIZE = 10000
+_memo: Dict[Tuple[Hashable, ...], Decimal] = {}
+_memo_version = None
+
+
+CENTS = Decimal("0.01")
+
+
+def discounted_price(price, is_on_sale, discount_percent):
+    """List price with the sale discount applied (the single discount formula).
+
+    Rounded half-up to whole kopecks, like the ``Candle.effective_price``
+    column, so listings, cart, checkout and the API agree on the price.
+    """
+    if is_on_sale and discount_percent:
+        try:
+            return ((price * (100 - discount_percent)) / 100).quantize(CENTS, rounding=ROUND_HALF_UP)
+        except Exception:
+            return price
+    return price
+
+
+def _current_memo(version) -> Dict[Tuple[Hashable, ...], Decimal]:
+    global _memo, _memo_version
+    if version != _memo_version or len(_memo) > MAX_MEMO_SIZE:
+        _memo = {}
+        _memo_version = version
+    return _memo
+
+
+def unit_price(candle, option_values: Iterable = (), version=None) -> Decimal:
+    """Price of one unit of ``candle`` with the given option values selected.
+
+    ``option_values`` are objects with ``id`` and ``price_modifier``
+    (model instances or option tree nodes).
+    """
+    option_values = tuple(option_values)
+    memo = _current_memo(get_catalog_version() if version is None else version)
+    key = (
+        candle.pk,
+        candle.price,
+        bool(candle.is_on_sale),
+        candle.discount_percent,
+        frozenset((v.id, v.price_modifier) for v in option_values),
+    )
+    price = memo.get(key)
+    if price is None:
+        price = candle.discounted_price()
+        for value in option_values:
+            price += value.price_modifier
+        memo[key] = price
+    return price
+
+
+class PricedLine:
+    __slots__ = ("line", "candle", "option_values", "unit_price", "subtotal")
+
+    def __init__(self, line, candle, option_values, unit_price):
+        self.line = line
+        self.candle = candle
+        self.option_values = option_values
+        self.unit_price = unit_price
+        self.subtotal = unit_price * line.qty
+
+    @property
+    def price_modifier(self) -> Decimal:
+        return sum((v.price_modifier for v in self.option_values), Decimal("0"))
+
+
+def price_lines(lines, candles, option_values_for, version=None):
+    """Prices cart lines in one pass from pre-resolved candle rows.
+
+    ``candles`` maps pk to Candle; ``option_values_for(line)`` returns the
+    line's option values, or None when one of them no longer exists.
+    Returns ``(priced_lines, total, dropped_lines)``.
+    """
+    if version is None:
+        version = get_catalog_version()
+    priced = []
+    dropped = []
+    total = Decimal("0")
+    for line in lines:
+        candle = candles.get(line.pk)
+        option_values = option_values_for(line) if candle is not None else None
+        if option_values is None:
+            dropped.append(line)
+            continue
+        priced_line = PricedLine(line, candle, option_values, unit_price(candle, option_values, version))
+        priced.append(priced_line)
+        total += priced_line.subtotal
+    return priced, total, dropped
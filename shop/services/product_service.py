@@ -1,25 +1,93 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
-from django.db.models import Q, Case, When, Value, IntegerField
+from django.utils.functional import cached_property
+from django.db.models import Case, When, Value, IntegerField
 
 from ..models import Candle, Collection, HomeBanner, Category
+from .catalog_filters import CatalogFilters
+from .catalog_service import get_catalog_version
+from .catalog_snapshot import get_catalog_snapshot
+from .card_service import render_candle_cards
+from .cursor_pagination import CursorPaginator
+from .facet_service import get_catalog_facets
+from .listing_service import card_values, cards_for_ids, to_cards
+
+PRODUCTS_PER_PAGE = 20
+
+# Sort key per ?sort= value; every ordering ends with the unique id so it is
+# total, which cursor pagination requires.
+SORT_ORDERINGS = {
+    "price_asc": ("effective_price", "id"),
+    "price_desc": ("-effective_price", "-id"),
+    "name_asc": ("name", "id"),
+    "name_desc": ("-name", "-id"),
+}
+DEFAULT_ORDERING = ("sort_priority", "-id")
+SEARCH_ORDERING = ("search_rank", "-id")
+
+COUNT_CACHE_TIMEOUT = 60 * 60
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator whose ``count`` is cached under ``count_key``.
+
+    The key must identify the filtered queryset; the catalog version is
+    part of it, so catalog edits start a fresh count.
+    """
+
+    def __init__(self, object_list, per_page, count_key, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+
+    @cached_property
+    def count(self):
+        count = cache.get(self.count_key)
+        if count is None:
+            count = super().count
+            cache.set(self.count_key, count, COUNT_CACHE_TIMEOUT)
+        return count
+
+
+def _count_cache_key(filters):
+    digest = hashlib.md5(repr(filters.signature()).encode("utf-8")).hexdigest()
+    return f"shop:catalog_count:{get_catalog_version()}:{digest}"
+
+
+def snapshot_enabled() -> bool:
+    return getattr(settings, "CATALOG_SNAPSHOT", False)
+
+
+def _candles_from_snapshot(snapshot, ids):
+    """Cards for ``ids`` in that order, with ``has_options`` from the snapshot."""
+    return cards_for_ids(ids, {pk: snapshot.records[pk].has_options for pk in ids})
+
+
+def _home_candles_from_snapshot():
+    snapshot = get_catalog_snapshot()
+    ordered = snapshot.ordered_ids(("order", "-id"))
+    ids = [pk for pk in ordered if snapshot.records[pk].is_hit][:6]
+    if len(ids) < 6:
+        chosen = set(ids)
+        ids.extend([pk for pk in ordered if pk not in chosen][: 6 - len(ids)])
+    return _candles_from_snapshot(snapshot, ids)
 
 
 def get_home_data():
-    hits = list(Candle.objects.filter(is_hit=True).order_by("order", "-id")[:6])
-    if len(hits) < 6:
-        exclude_ids = [c.pk for c in hits]
-        fill_qs = Candle.objects.exclude(pk__in=exclude_ids).order_by("order", "-id")[
-            : (6 - len(hits))
-        ]
-        hits.extend(list(fill_qs))
-    candles = hits
-
-    candles_with_options_ids = []
-    for c in Candle.objects.filter(pk__in=[c.pk for c in candles]).prefetch_related(
-        "options"
-    ):
-        if c.options.exists():
-            candles_with_options_ids.append(c.pk)
+    if snapshot_enabled():
+        candles = _home_candles_from_snapshot()
+    else:
+        candle_qs = Candle.objects.all()
+        hits = to_cards(card_values(candle_qs.filter(is_hit=True).order_by("order", "-id")[:6]))
+        if len(hits) < 6:
+            exclude_ids = [c.pk for c in hits]
+            fill_qs = candle_qs.exclude(pk__in=exclude_ids).order_by("order", "-id")[
+                : (6 - len(hits))
+            ]
+            hits.extend(to_cards(card_values(fill_qs)))
+        candles = hits
 
     collections = Collection.objects.all().order_by("order", "code")
 
@@ -30,85 +98,32 @@ def get_home_data():
 
     return {
         "candles": candles,
+        "cards": render_candle_cards(candles, "home"),
         "collections": collections,
-        "candles_with_options_ids": candles_with_options_ids,
         "banners": banners,
     }
 
 
-def get_product_list_data(request):
-    q = request.GET.get("q", "").strip()
-    qs = (
-        Candle.objects.prefetch_related("categories", "categories__group").annotate(
-            sort_priority=Case(
-                When(is_hit=True, is_on_sale=True, then=Value(0)),
-                When(is_hit=False, is_on_sale=True, then=Value(1)),
-                When(is_hit=True, is_on_sale=False, then=Value(2)),
-                default=Value(3),
-                output_field=IntegerField(),
-            )
-        )
-    )
+def get_product_list_data(request, render_cards=True):
+    qs = Candle.objects.all()
 
-    collection_code = request.GET.get("collection")
-    if collection_code:
-        try:
-            qs = qs.filter(collection__code=collection_code)
-        except Exception:
-            pass
-
-    if q:
-        q_cap = q.capitalize()
-        qs = qs.filter(
-            Q(name__icontains=q)
-            | Q(name_ru__icontains=q)
-            | Q(categories__name__icontains=q)
-            | Q(categories__name_ru__icontains=q)
-            | Q(description__icontains=q)
-            | Q(description_ru__icontains=q)
-            | Q(name__contains=q_cap)
-            | Q(name_ru__contains=q_cap)
-            | Q(categories__name__contains=q_cap)
-            | Q(categories__name_ru__contains=q_cap)
-            | Q(description__contains=q_cap)
-            | Q(description_ru__contains=q_cap)
-        ).distinct()
-
-    category_id = request.GET.get("category")
-    if category_id:
-        try:
-            qs = qs.filter(categories__id=int(category_id)).distinct()
-        except (ValueError, TypeError):
-            pass
-
-    group_id = request.GET.get("group")
-    if group_id:
-        try:
-            qs = qs.filter(categories__group_id=int(group_id)).distinct()
-        except (ValueError, TypeError):
-            pass
-
-    min_price = request.GET.get("min_price")
-    max_price = request.GET.get("max_price")
-    try:
-        if min_price:
-            qs = qs.filter(price__gte=float(min_price))
-        if max_price:
-            qs = qs.filter(price__lte=float(max_price))
-    except (ValueError, TypeError):
-        pass
+    filters = CatalogFilters.from_params(request.GET)
+    qs = filters.apply(qs)
+    search_ids = filters.search_ids
 
     sort = request.GET.get("sort")
-    if sort == "price_asc":
-        qs = qs.order_by("price")
-    elif sort == "price_desc":
-        qs = qs.order_by("-price")
-    elif sort == "name_asc":
-        qs = qs.order_by("name")
-    elif sort == "name_desc":
-        qs = qs.order_by("-name")
+    if sort in SORT_ORDERINGS:
+        ordering = SORT_ORDERINGS[sort]
+    elif search_ids:
+        qs = qs.annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(rank)) for rank, pk in enumerate(search_ids)],
+                output_field=IntegerField(),
+            )
+        )
+        ordering = SEARCH_ORDERING
     else:
-        qs = qs.order_by("sort_priority", "-id")
+        ordering = DEFAULT_ORDERING
 
     categories = (
         Category.objects.select_related("group")
@@ -116,28 +131,76 @@ def get_product_list_data(request):
         .order_by("group__order", "group__name", "order", "name")
     )
 
-    paginator = Paginator(qs, 20)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
-    candles_with_options_ids = []
-    for c in page_obj:
-        if c.options.exists():
-            candles_with_options_ids.append(c.pk)
+    cursor_page = None
+    snapshot = None
+    # The snapshot cannot run the substring fallback search; those queries
+    # (and keyset pagination, which is index-backed) stay on the ORM path.
+    # So do name orderings: the database collation (MySQL) orders Є/І/Ї and
+    # letter case differently from Python's codepoint sort.
+    use_snapshot = (
+        snapshot_enabled()
+        and not (filters.q and search_ids is None)
+        and getattr(settings, "CATALOG_PAGINATION", "page") != "cursor"
+        and not any(order.lstrip("-") == "name" for order in ordering)
+    )
+    if use_snapshot:
+        snapshot = get_catalog_snapshot()
+        ids = snapshot.select(filters, ordering, search_ids if ordering == SEARCH_ORDERING else None)
+        paginator = Paginator(ids, PRODUCTS_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get("page"))
+        page_obj.object_list = _candles_from_snapshot(snapshot, list(page_obj.object_list))
+    elif getattr(settings, "CATALOG_PAGINATION", "page") == "cursor":
+        # Keyset pages: no COUNT query, no OFFSET scan. The sort key columns
+        # are projected too, the cursor is built from them.
+        paginator = None
+        rows = card_values(qs, extra=[order.lstrip("-") for order in ordering])
+        page_obj = cursor_page = CursorPaginator(rows, ordering, PRODUCTS_PER_PAGE).get_page(
+            request.GET.get("cursor")
+        )
+        page_obj.object_list = to_cards(page_obj.object_list)
+    else:
+        paginator = CachedCountPaginator(
+            card_values(qs.order_by(*ordering)), PRODUCTS_PER_PAGE, _count_cache_key(filters)
+        )
+        page_obj = paginator.get_page(request.GET.get("page"))
+        page_obj.object_list = to_cards(page_obj.object_list)
 
     current_get = request.GET.copy()
-    if "page" in current_get:
-        current_get.pop("page")
+    for key in ("page", "cursor"):
+        current_get.pop(key, None)
     querystring = current_get.urlencode()
 
+    facets = get_catalog_facets(filters, snapshot)
+    price_get = current_get.copy()
+    for key in ("min_price", "max_price"):
+        price_get.pop(key, None)
+    price_facets = []
+    for bucket in facets["price_buckets"]:
+        bucket_get = price_get.copy()
+        if bucket["min"] is not None:
+            bucket_get["min_price"] = bucket["min"]
+        if bucket["max"] is not None:
+            bucket_get["max_price"] = bucket["max"]
+        price_facets.append(
+            {
+                **bucket,
+                "querystring": bucket_get.urlencode(),
+                "active": (filters.min_price, filters.max_price) == (bucket["min"], bucket["max"]),
+            }
+        )
+
     return {
         "candles": page_obj,
+        "cards": render_candle_cards(page_obj, "list") if render_cards else [],
         "page_obj": page_obj,
         "paginator": paginator,
-        "query": q,
+        "cursor_page": cursor_page,
+        "query": filters.q,
         "categories": categories,
+        "selected_categories": set(filters.categories),
         "querystring": querystring,
-        "candles_with_options_ids": candles_with_options_ids,
+        "facets": facets,
+        "price_facets": price_facets,
     }
 
 
@@ -0,0 +1,133 @@
+import logging
+import re
+from typing import Iterable, List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from ..models import Candle, CandleCategory
+from .fuzzy_search import fuzzy_search_ids
+
+logger = logging.getLogger(__name__)
+
+# SQLite: FTS5 table with rowid = candle id, kept in sync from Python (see
+# refresh_search_documents). MySQL: FULLTEXT index on shop_candle.search_document.
+SQLITE_FTS_TABLE = "shop_candle_fts"
+MYSQL_MIN_TOKEN_LENGTH = 3
+MAX_SEARCH_RESULTS = 500
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_search_document(candle, category_names: Iterable[str] = ()) -> str:
+    """Both languages of name/description plus category names, one text blob."""
+    parts = [
+        candle.name,
+        candle.name_ru,
+        *category_names,
+        candle.description,
+        candle.description_ru,
+    ]
+    return "\n".join(p for p in parts if p)
+
+
+def refresh_search_documents(candle_ids: Iterable[int]) -> None:
+    candle_ids = {pk for pk in candle_ids if pk}
+    if not candle_ids:
+        return
+    category_names = {}
+    links = CandleCategory.objects.filter(candle_id__in=candle_ids).values_list(
+        "candle_id", "category__name", "category__name_ru"
+    )
+    for candle_id, name, name_ru in links:
+        category_names.setdefault(candle_id, []).extend(n for n in (name, name_ru) if n)
+
+    candles = Candle.objects.filter(pk__in=candle_ids).only(
+        "pk", "name", "name_ru", "description", "description_ru", "search_document"
+    )
+    for candle in candles:
+        document = build_search_document(candle, category_names.get(candle.pk, ()))
+        if document != candle.search_document:
+            Candle.objects.filter(pk=candle.pk).update(search_document=document)
+        _sync_sqlite_index(candle.pk, document)
+
+
+def remove_from_search_index(candle_id: int) -> None:
+    _sync_sqlite_index(candle_id, None)
+
+
+def rebuild_search_index() -> int:
+    ids = list(Candle.objects.values_list("pk", flat=True))
+    if connection.vendor == "sqlite" and _sqlite_index_exists():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE}")
+    refresh_search_documents(ids)
+    return len(ids)
+
+
+def _sqlite_index_exists() -> bool:
+    return SQLITE_FTS_TABLE in connection.introspection.table_names()
+
+
+def _sync_sqlite_index(candle_id: int, document: Optional[str]) -> None:
+    if connection.vendor != "sqlite":
+        return
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = %s", [candle_id])
+            if document:
+                cursor.execute(
+                    f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, document) VALUES (%s, %s)",
+                    [candle_id, document],
+                )
+    except DatabaseError:
+        logger.warning("Search index unavailable, candle %s not indexed", candle_id)
+
+
+def search_candle_ids(query: str, limit: int = MAX_SEARCH_RESULTS) -> Optional[List[int]]:
+    """Candle ids matching ``query``, best match first.
+
+    Returns None when the database has no full-text index (or the query
+    cannot be expressed for it) so callers can fall back to substring search.
+    With ``CATALOG_SEARCH = "fuzzy"`` the in-memory trigram index answers
+    instead (transliteration- and typo-tolerant, names and categories only).
+    """
+    if getattr(settings, "CATALOG_SEARCH", "fulltext") == "fuzzy":
+        return fuzzy_search_ids(query, limit)
+    tokens = [t.lower() for t in _TOKEN_RE.findall(query or "")]
+    if not tokens:
+        return None
+    try:
+        if connection.vendor == "sqlite":
+            return _search_sqlite(tokens, limit)
+        if connection.vendor == "mysql":
+            return _search_mysql(tokens, limit)
+    except DatabaseError:
+        logger.warning("Full-text search failed, falling back to substring search", exc_info=True)
+    return None
+
+
+def _search_sqlite(tokens: List[str], limit: int) -> List[int]:
+    match = " ".join(f'"{t}"*' for t in tokens)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH %s "
+            f"ORDER BY bm25({SQLITE_FTS_TABLE}) LIMIT %s",
+            [match, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_mysql(tokens: List[str], limit: int) -> Optional[List[int]]:
+    # InnoDB ignores words shorter than innodb_ft_min_token_size.
+    if any(len(t) < MYSQL_MIN_TOKEN_LENGTH for t in tokens):
+        return None
+    against = " ".join(f"+{t}*" for t in tokens)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT id FROM shop_candle "
+            "WHERE MATCH(search_document) AGAINST (%s IN BOOLEAN MODE) "
+            "ORDER BY MATCH(search_document) AGAINST (%s IN BOOLEAN MODE) DESC LIMIT %s",
+            [against, against, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,113 @@
+import heapq
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+from django.urls import reverse
+from django.utils import translation
+
+from ..models import Candle, Category, Scent
+from .catalog_service import get_catalog_version
+
+MAX_SUGGESTIONS = 8
+# Upper bound on keys inspected per query, so one-letter prefixes stay cheap
+MAX_SCAN = 500
+# Lower kind sorts first in the suggestion list
+KIND_ORDER = {"candle": 0, "category": 1, "scent": 2}
+
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").casefold().replace("ё", "е").split())
+
+
+class Suggestion:
+    __slots__ = ("kind", "id", "name", "name_ru", "url", "sort_key")
+
+    def __init__(self, kind, id, name, name_ru, url):
+        self.kind = kind
+        self.id = id
+        self.name = name or ""
+        self.name_ru = name_ru or ""
+        self.url = url
+        self.sort_key = _normalize(self.name or self.name_ru)
+
+    def label(self) -> str:
+        if (translation.get_language() or "").lower().startswith("ru"):
+            return self.name_ru or self.name
+        return self.name or self.name_ru
+
+    def to_data(self) -> Dict:
+        return {"type": self.kind, "id": self.id, "label": self.label(), "url": self.url}
+
+
+class PrefixIndex:
+    """Sorted array of (key, entry) pairs searched with bisect.
+
+    Every word suffix of every name is a key ("свічка з лавандою" is found
+    by "сві", "лав" and "з лав"), in both languages.
+    """
+
+    def __init__(self, entries: List[Suggestion]):
+        pairs: List[Tuple[str, int, bool]] = []
+        for idx, entry in enumerate(entries):
+            for name in {entry.name, entry.name_ru}:
+                words = _normalize(name).split(" ")
+                for i in range(len(words)):
+                    key = " ".join(words[i:])
+                    if key:
+                        pairs.append((key, idx, i == 0))
+        pairs.sort()
+        self.keys = [key for key, _, _ in pairs]
+        self.refs = [(idx, whole) for _, idx, whole in pairs]
+        self.entries = entries
+
+    def search(self, query: str, limit: int = MAX_SUGGESTIONS) -> List[Suggestion]:
+        prefix = _normalize(query)
+        if not prefix:
+            return []
+        found = {}
+        i = bisect_left(self.keys, prefix)
+        end = min(len(self.keys), i + MAX_SCAN)
+        while i < end and self.keys[i].startswith(prefix):
+            idx, whole = self.refs[i]
+            # a match at the start of the name beats a match on a later word
+            rank = (KIND_ORDER[self.entries[idx].kind], not whole)
+            if idx not in found or rank < found[idx]:
+                found[idx] = rank
+            i += 1
+        best = heapq.nsmallest(limit, found, key=lambda idx: (found[idx], self.entries[idx].sort_key))
+        return [self.entries[idx] for idx in best]
+
+
+def build_prefix_index() -> PrefixIndex:
+    entries = []
+    for pk, name, name_ru in Candle.objects.values_list("pk", "name", "name_ru"):
+        entries.append(Suggestion("candle", pk, name, name_ru, reverse("product_detail", args=[pk])))
+    product_list_url = reverse("product_list")
+    for pk, name, name_ru in Category.objects.values_list("pk", "name", "name_ru"):
+        entries.append(Suggestion("category", pk, name, name_ru, f"{product_list_url}?category={pk}"))
+    for pk, name, name_ru in Scent.objects.values_list("pk", "name", "name_ru"):
+        entries.append(Suggestion("scent", pk, name, name_ru, reverse("scent_detail", args=[pk])))
+    return PrefixIndex(entries)
+
+
+# One index per worker process, rebuilt on the first request after the
+# catalog version moves.
+_index = None
+_index_version = None
+_lock = threading.Lock()
+
+
+def get_prefix_index() -> PrefixIndex:
+    global _index, _index_version
+    version = get_catalog_version()
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = build_prefix_index()
+                _index_version = version
+    return _index
+
+
+def suggest(query: str, limit: int = MAX_SUGGESTIONS) -> List[Dict]:
+    return [entry.to_data() for entry in get_prefix_index().search(query, limit)]
@@ -0,0 +1,46 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import translation
+
+from shop.models import Candle, ProductOption
+from shop.services import card_service
+from shop.services.card_service import render_candle_cards
+from shop.services.listing_service import card_values, to_cards
+
+
+class CardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Candle.objects.create(name="Кедр", name_ru="Кедр ру", description="", price=Decimal("90.00"))
+        Candle.objects.create(name="Троянда", name_ru="Роза", description="", price=Decimal("95.00"))
+
+    def _cards(self, lang="uk"):
+        with translation.override(lang):
+            return render_candle_cards(to_cards(card_values(Candle.objects.order_by("id"))), "list")
+
+    def test_cards_are_rendered_once(self):
+        first = self._cards()
+        with mock.patch.object(card_service, "render_to_string") as render, self.assertNumQueries(1):
+            self.assertEqual(self._cards(), first)
+        render.assert_not_called()
+
+    def test_cards_are_per_language(self):
+        self.assertIn("Роза", self._cards("ru")[1])
+        self.assertIn("Троянда", self._cards("uk")[1])
+
+    def test_edit_rerenders_only_that_card(self):
+        self._cards()
+        candle = Candle.objects.get(name="Кедр")
+        ProductOption.objects.create(product=candle, name="Розмір")
+        with mock.patch.object(card_service, "render_to_string", return_value="fresh") as render:
+            cards = self._cards()
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(cards[0], "fresh")
+
+    def test_bulk_update_rerenders_the_card(self):
+        self.assertNotIn("badge-sale", self._cards()[0])
+        Candle.objects.filter(name="Кедр").update(is_on_sale=True, discount_percent=20)
+        self.assertIn("badge-sale", self._cards()[0])
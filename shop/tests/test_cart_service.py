@@ -0,0 +1,243 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import translation
+
+from shop.models import Candle, ProductOption, ProductOptionValue
+from shop.services.cart_schema import Cart, CartLine, CartSummary
+from shop.services.cart_service import add_to_cart, apply_cart_batch, resolve_cart, update_cart
+from shop.services.pricing_service import unit_price
+
+
+class ResolveCartTests(TestCase):
+    def _create_candle(self, price="100.00", **kwargs) -> Candle:
+        return Candle.objects.create(
+            name="Свеча тест",
+            description="Описание",
+            price=price,
+            **kwargs,
+        )
+
+    def test_resolves_all_lines_in_one_query(self):
+        a = self._create_candle()
+        b = self._create_candle(price="50.00", is_on_sale=True, discount_percent=10)
+        cart = Cart([CartLine(a.pk, 2), CartLine(b.pk, 1)]).to_data()
+
+        with self.assertNumQueries(1):
+            snapshot = resolve_cart(cart)
+
+        self.assertEqual(len(snapshot), 2)
+        self.assertEqual(snapshot.total, Decimal("245.00"))
+        self.assertEqual(snapshot.items[1]["price"], Decimal("45.00"))
+
+    def test_legacy_lines_resolve_option_names_at_render_time(self):
+        a = self._create_candle()
+        option = ProductOption.objects.create(product=a, name="Колір", name_ru="Цвет")
+        value = ProductOptionValue.objects.create(
+            option=option, value="Білий", value_ru="Белый", price_modifier=Decimal("5.00")
+        )
+        cart = {
+            str(a.pk): 1,
+            f"{a.pk}_{option.pk}:{value.pk}": {
+                "pk": a.pk,
+                "qty": 1,
+                "options": {str(option.pk): value.pk},
+                "options_display": {"Колір": "Білий"},
+                "price_modifier": "5.00",
+            },
+        }
+
+        with self.assertNumQueries(2), translation.override("ru"):
+            snapshot = resolve_cart(cart)
+
+        self.assertEqual(snapshot.total, Decimal("205.00"))
+        line = snapshot.items[1]
+        self.assertEqual(line["cart_key"], f"{a.pk}_{option.pk}:{value.pk}")
+        self.assertEqual(line["options_display"], {"Цвет": "Белый"})
+        self.assertEqual(line["selected_options"], {str(option.pk): value.pk})
+
+    def test_deleted_products_are_dropped(self):
+        a = self._create_candle()
+        cart = {str(a.pk): 1, "999999": 3}
+
+        snapshot = resolve_cart(cart)
+
+        self.assertEqual([it["candle"].pk for it in snapshot.items], [a.pk])
+        self.assertEqual(snapshot.total, Decimal("100.00"))
+
+
+class UpdateCartTests(TestCase):
+    def setUp(self):
+        self.candle = Candle.objects.create(name="Свеча", description="", price=Decimal("100.00"))
+        self.other = Candle.objects.create(name="Свеча 2", description="", price=Decimal("40.00"))
+
+    def _stamped_cart(self):
+        cart, _, _ = add_to_cart({}, self.candle, 1, {})
+        cart, _, _ = add_to_cart(cart, self.other, 2, {})
+        return cart
+
+    def test_mutation_uses_stamped_prices(self):
+        cart = self._stamped_cart()
+
+        with self.assertNumQueries(0):
+            cart, response, status = update_cart(cart, str(self.candle.pk), "inc", 1)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(response["items"], 4)
+        self.assertEqual(response["item_subtotal"], "200.00")
+        self.assertEqual(response["total"], "280.00")
+
+    def test_catalog_change_reprices_whole_cart(self):
+        cart = self._stamped_cart()
+        self.other.price = Decimal("10.00")
+        self.other.save()
+
+        with self.assertNumQueries(1):
+            cart, response, _ = update_cart(cart, str(self.candle.pk), "dec", 1)
+
+        self.assertEqual(response["items"], 2)
+        self.assertEqual(response["total"], "20.00")
+
+    def test_legacy_int_lines_are_upgraded(self):
+        cart, response, _ = update_cart({str(self.candle.pk): 2}, str(self.candle.pk), "inc", 1)
+
+        self.assertEqual(response["total"], "300.00")
+        self.assertEqual(cart.get(str(self.candle.pk)).qty, 3)
+
+
+class AddToCartOptionsTests(TestCase):
+    def setUp(self):
+        self.candle = Candle.objects.create(name="Свеча", description="", price=Decimal("100.00"))
+        self.color = ProductOption.objects.create(product=self.candle, name="Колір", is_required=True)
+        self.white = ProductOptionValue.objects.create(option=self.color, value="Білий")
+        self.black = ProductOptionValue.objects.create(
+            option=self.color, value="Чорний", price_modifier=Decimal("15.00")
+        )
+        self.wick = ProductOption.objects.create(product=self.candle, name="Гніт", is_required=False)
+        self.wood = ProductOptionValue.objects.create(
+            option=self.wick, value="Дерев'яний", price_modifier=Decimal("5.00")
+        )
+
+    def test_options_are_validated_from_one_query(self):
+        selected = {str(self.color.pk): self.black.pk, str(self.wick.pk): self.wood.pk}
+
+        with self.assertNumQueries(1):
+            cart, response, status = add_to_cart({}, self.candle, 1, selected)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(response["final_price"], "120.00")
+        self.assertEqual(
+            response["cart_key"],
+            f"{self.candle.pk}_{self.color.pk}:{self.black.pk}_{self.wick.pk}:{self.wood.pk}",
+        )
+
+        with self.assertNumQueries(0):
+            add_to_cart(cart, self.candle, 1, selected)
+
+    def test_error_codes(self):
+        cases = [
+            ({}, "missing_required_options"),
+            ({str(self.color.pk): "x"}, "invalid_option_format"),
+            ({str(self.color.pk): self.white.pk, "999999": 1}, "invalid_option"),
+            ({str(self.color.pk): self.wood.pk}, "invalid_value"),
+        ]
+        for selected, error in cases:
+            with self.subTest(error=error):
+                _, response, status = add_to_cart({}, self.candle, 1, selected)
+                self.assertEqual(status, 400)
+                self.assertEqual(response["error"], error)
+
+
+class CartSchemaTests(TestCase):
+    def test_round_trip_stores_ids_only(self):
+        cart = Cart([CartLine(7, 2, [(3, 9), (1, 4)], Decimal("12.50"), 5), CartLine(8, 1)])
+
+        data = cart.to_data()
+        restored = Cart.from_data(data)
+
+        self.assertEqual(data["l"], [[7, 2, [[1, 4], [3, 9]], "12.50", 5], [8, 1, [], None, None]])
+        self.assertEqual([line.key for line in restored], ["7_1:4_3:9", "8"])
+        self.assertTrue(restored.get("7_1:4_3:9").is_priced(5))
+        self.assertEqual(restored.count(), 3)
+
+    def test_malformed_legacy_lines_are_skipped(self):
+        cart = Cart.from_data({"5": 2, "x": 1, "6": {"pk": 6, "qty": 0}, "7": "3"})
+
+        self.assertEqual([(line.pk, line.qty) for line in cart], [(5, 2), (7, 3)])
+
+
+class CartBatchTests(TestCase):
+    def setUp(self):
+        self.a = Candle.objects.create(name="Свеча A", description="", price=Decimal("100.00"))
+        self.b = Candle.objects.create(name="Свеча B", description="", price=Decimal("40.00"))
+
+    def test_operations_are_applied_together(self):
+        cart, _, _ = add_to_cart({}, self.a, 3, {})
+
+        cart, response, status = apply_cart_batch(
+            cart,
+            [
+                {"op": "add", "pk": self.b.pk, "qty": 2},
+                {"op": "set", "key": str(self.a.pk), "qty": 1},
+                {"op": "add", "pk": self.b.pk},
+            ],
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(response["items"], 4)
+        self.assertEqual(response["total"], "220.00")
+        self.assertEqual(response["lines"][str(self.b.pk)], {"qty": 3, "subtotal": "120.00"})
+
+    def test_failing_operation_leaves_cart_untouched(self):
+        cart, _, _ = add_to_cart({}, self.a, 1, {})
+
+        result, response, status = apply_cart_batch(
+            cart,
+            [
+                {"op": "remove", "key": str(self.a.pk)},
+                {"op": "add", "pk": 999999},
+            ],
+        )
+
+        self.assertEqual(status, 404)
+        self.assertEqual(response["index"], 1)
+        self.assertEqual(result.count(), 1)
+
+    def test_summary_is_read_without_decoding_lines(self):
+        data = Cart([CartLine(7, 2, price=Decimal("10.00"), cv=1), CartLine(8, 1, price=Decimal("5.00"), cv=1)]).to_data()
+        data["l"] = None
+
+        summary = CartSummary.from_data(data)
+
+        self.assertEqual(summary.count, 3)
+        self.assertEqual(summary.total, Decimal("25.00"))
+        self.assertEqual(CartSummary.from_data({"5": 2}).count, 2)
+
+
+class PricingTests(TestCase):
+    def test_unit_price_memo_follows_the_loaded_row(self):
+        candle = Candle.objects.create(name="Свеча", description="", price=Decimal("100.00"))
+        option = ProductOption.objects.create(product=candle, name="Колір")
+        value = ProductOptionValue.objects.create(option=option, value="Білий", price_modifier=Decimal("7.00"))
+
+        self.assertEqual(unit_price(candle, [value]), Decimal("107.00"))
+
+        candle.is_on_sale, candle.discount_percent = True, 50
+        self.assertEqual(unit_price(candle, [value]), Decimal("57.00"))
+
+        value.price_modifier = Decimal("9.00")
+        self.assertEqual(unit_price(candle, [value]), Decimal("59.00"))
+
+    def test_bulk_update_reprices_the_cart(self):
+        candle = Candle.objects.create(
+            name="Свеча", description="", price=Decimal("100.00"), is_on_sale=True, discount_percent=50
+        )
+        cart, _, _ = add_to_cart({}, candle, 1, {})
+        self.assertEqual(resolve_cart(cart).total, Decimal("50.00"))
+
+        # no signals, so the catalog version does not move
+        Candle.objects.filter(pk=candle.pk).update(is_on_sale=False, discount_percent=None)
+
+        self.assertEqual(resolve_cart(cart).total, Decimal("100.00"))
+        cart, response, _ = add_to_cart(cart, Candle.objects.get(pk=candle.pk), 1, {})
+        self.assertEqual(resolve_cart(cart).total, Decimal("200.00"))
@@ -0,0 +1,168 @@
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from shop.models import Candle, StoredCart, StoredCartLine
+from shop.services.cart_service import add_to_cart, update_cart
+from shop.services.cart_store import DatabaseCartStore
+
+
+@override_settings(CART_STORAGE="cookie", SECURE_SSL_REDIRECT=False)
+class CookieCartStoreTests(TestCase):
+    def setUp(self):
+        self.candle = Candle.objects.create(name="Свеча", description="", price=Decimal("100.00"))
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "uk"
+
+    def _add(self, qty=1):
+        return self.client.post(
+            reverse("cart_add"),
+            data=json.dumps({"pk": self.candle.pk, "qty": qty}),
+            content_type="application/json",
+        )
+
+    def test_cart_lives_in_signed_cookie(self):
+        resp = self._add(2)
+
+        self.assertEqual(resp.json()["items"], 2)
+        self.assertIn("cart", resp.cookies)
+        self.assertFalse(Session.objects.exists())
+
+        resp = self.client.post(
+            reverse("cart_update"),
+            data=json.dumps({"pk": str(self.candle.pk), "action": "inc"}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.json()["total"], "300.00")
+
+        resp = self.client.get(reverse("cart_view"))
+        self.assertContains(resp, self.candle.display_name())
+        self.assertFalse(Session.objects.exists())
+
+    def test_tampered_cookie_is_ignored(self):
+        self._add()
+        self.client.cookies["cart"] = self.client.cookies["cart"].value + "x"
+
+        resp = self.client.get(reverse("cart_view"))
+
+        self.assertEqual(resp.context["cart_count"], 0)
+
+    @override_settings(CART_COOKIE_MAX_BYTES=10)
+    def test_oversized_cart_is_rejected(self):
+        resp = self._add()
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()["error"], "cart_full")
+
+
+@override_settings(CART_STORAGE="database", SECURE_SSL_REDIRECT=False)
+class DatabaseCartStoreTests(TestCase):
+    def setUp(self):
+        self.candle = Candle.objects.create(name="Свеча", description="", price=Decimal("100.00"))
+        self.other = Candle.objects.create(name="Свеча 2", description="", price=Decimal("40.00"))
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "uk"
+
+    def _post(self, name, payload):
+        return self.client.post(reverse(name), data=json.dumps(payload), content_type="application/json")
+
+    def test_cart_lines_are_stored_as_rows(self):
+        self._post("cart_add", {"pk": self.candle.pk, "qty": 2})
+        self._post("cart_add", {"pk": self.other.pk, "qty": 1})
+
+        stored = StoredCart.objects.get()
+        self.assertEqual(stored.item_count, 3)
+        self.assertEqual(stored.total, Decimal("240.00"))
+        self.assertEqual(
+            sorted(stored.lines.values_list("key", "qty")),
+            sorted([(str(self.candle.pk), 2), (str(self.other.pk), 1)]),
+        )
+        self.assertFalse(Session.objects.exists())
+
+        resp = self._post("cart_update", {"pk": str(self.other.pk), "action": "remove"})
+        self.assertEqual(resp.json()["total"], "200.00")
+        self.assertEqual(list(stored.lines.values_list("key", flat=True)), [str(self.candle.pk)])
+
+        resp = self.client.get(reverse("cart_view"))
+        self.assertEqual(resp.context["cart_count"], 2)
+        self.assertContains(resp, self.candle.display_name())
+
+    def test_concurrent_adds_of_the_same_product_are_merged(self):
+        self._post("cart_add", {"pk": self.other.pk, "qty": 1})
+        token = StoredCart.objects.get().token
+
+        def store():
+            request = RequestFactory().get("/")
+            request.COOKIES["cart_token"] = token
+            return DatabaseCartStore(request)
+
+        # both requests load the cart before either one saves
+        first, second = store(), store()
+        first_cart, _, _ = add_to_cart(first.load(), self.candle, 1, {})
+        second_cart, _, _ = add_to_cart(second.load(), self.candle, 1, {})
+        first.save(first_cart, HttpResponse())
+        second.save(second_cart, HttpResponse())
+
+        self.assertEqual(StoredCartLine.objects.get(key=str(self.candle.pk)).qty, 2)
+        stored = StoredCart.objects.get()
+        self.assertEqual((stored.item_count, stored.total), (3, Decimal("240.00")))
+        self.assertEqual(second.load().count(), 3)
+
+    def test_empty_cart_summary_matches_other_stores(self):
+        self.assertEqual(self.client.get(reverse("cart_summary")).json()["total"], "0")
+
+    def test_deleted_candle_is_dropped_from_the_badge(self):
+        self._post("cart_add", {"pk": self.candle.pk, "qty": 2})
+        self._post("cart_add", {"pk": self.other.pk, "qty": 1})
+
+        self.candle.delete()
+
+        stored = StoredCart.objects.get()
+        self.assertEqual((stored.item_count, stored.total), (1, Decimal("40.00")))
+        summary = self.client.get(reverse("cart_summary")).json()
+        self.assertEqual((summary["items"], summary["total"]), (1, "40.00"))
+
+    def test_quantity_change_updates_a_single_row(self):
+        self._post("cart_add", {"pk": self.candle.pk, "qty": 1})
+        self._post("cart_add", {"pk": self.other.pk, "qty": 1})
+        request = RequestFactory().get("/")
+        request.COOKIES["cart_token"] = StoredCart.objects.get().token
+        store = DatabaseCartStore(request)
+        cart, _, _ = update_cart(store.load(), str(self.candle.pk), "inc", 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            store.save(cart, HttpResponse())
+
+        line_updates = [q["sql"] for q in ctx.captured_queries if 'UPDATE "shop_storedcartline"' in q["sql"]]
+        self.assertEqual(len(line_updates), 1)
+        self.assertEqual(StoredCartLine.objects.get(key=str(self.candle.pk)).qty, 2)
+
+
+@override_settings(CART_BADGE_ASYNC=True, SECURE_SSL_REDIRECT=False)
+class AsyncCartBadgeTests(TestCase):
+    def setUp(self):
+        self.candle = Candle.objects.create(name="Свеча", description="", price=Decimal("100.00"))
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "uk"
+
+    def test_catalog_pages_do_not_depend_on_the_visitor(self):
+        self.client.post(
+            reverse("cart_add"),
+            data=json.dumps({"pk": self.candle.pk, "qty": 2}),
+            content_type="application/json",
+        )
+
+        for url in (reverse("home"), reverse("product_list"), reverse("product_detail", args=[self.candle.pk])):
+            with self.subTest(url=url):
+                resp = self.client.get(url)
+                self.assertEqual(resp.status_code, 200)
+                self.assertNotIn("Cookie", resp.get("Vary", ""))
+                self.assertContains(resp, 'data-summary-url="/cart/summary/"')
+
+        resp = self.client.get(reverse("cart_summary"))
+        self.assertEqual(resp.json(), {"ok": True, "items": 2, "total": "200.00"})
+        self.assertIn("no-cache", resp["Cache-Control"])
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shop.models import Candle, ProductOption
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class CatalogApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "uk"
+        self.cedar = Candle.objects.create(
+            name="Кедр", description="Опис", price=Decimal("200.00"), is_on_sale=True, discount_percent=10
+        )
+        self.rose = Candle.objects.create(name="Троянда", description="", price=Decimal("90.00"))
+        ProductOption.objects.create(product=self.rose, name="Розмір")
+
+    def test_product_list_uses_listing_filters(self):
+        response = self.client.get(reverse("api_product_list"), {"sort": "price_asc"})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([p["id"] for p in data["results"]], [self.rose.pk, self.cedar.pk])
+        self.assertEqual(data["results"][1]["effective_price"], "180.00")
+        self.assertTrue(data["results"][0]["has_options"])
+        self.assertEqual(data["pagination"]["count"], 2)
+
+        data = self.client.get(reverse("api_product_list"), {"max_price": "100"}).json()
+        self.assertEqual([p["id"] for p in data["results"]], [self.rose.pk])
+
+    def test_unchanged_catalog_answers_304_without_queries(self):
+        url = reverse("api_product_list")
+        etag = self.client.get(url, {"sort": "name_asc"})["ETag"]
+        self.assertFalse(etag.startswith("W/"))
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"sort": "name_asc"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        other = self.client.get(url, {"sort": "name_desc"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(other.status_code, 200)
+
+    def test_catalog_edit_changes_etag(self):
+        url = reverse("api_product_detail", args=[self.cedar.pk])
+        first = self.client.get(url)
+        self.assertEqual(first.json()["product"]["name"], "Кедр")
+        self.cedar.name = "Кедр новий"
+        self.cedar.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], first["ETag"])
+        self.assertEqual(response.json()["product"]["name"], "Кедр новий")
+
+    def test_list_and_detail_agree_on_the_discounted_price(self):
+        candle = Candle.objects.create(
+            name="Округлення", description="", price=Decimal("99.99"), is_on_sale=True, discount_percent=15
+        )
+        listed = {p["id"]: p for p in self.client.get(reverse("api_product_list")).json()["results"]}[candle.pk]
+        detail = self.client.get(reverse("api_product_detail", args=[candle.pk])).json()["product"]
+        self.assertEqual(listed["effective_price"], "84.99")
+        self.assertEqual(detail["effective_price"], listed["effective_price"])
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase, override_settings
+
+from shop.models import Candle, CandleCategory, Category, CategoryGroup, Collection, ProductOption
+from shop.services.catalog_filters import CatalogFilters
+from shop.services.catalog_snapshot import get_catalog_snapshot
+from shop.services.product_service import get_home_data, get_product_list_data
+
+
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        group = CategoryGroup.objects.create(name="Аромати")
+        self.wood = Category.objects.create(name="Деревні", group=group)
+        self.group = group
+        self.collection = Collection.objects.create(code="calm", title_uk="Спокій")
+        for i in range(30):
+            candle = Candle.objects.create(
+                name=f"Свічка {i % 7}",
+                description="",
+                price=Decimal("100.00") + i * 10,
+                is_hit=i % 3 == 0,
+                is_on_sale=i % 4 == 0,
+                discount_percent=20 if i % 4 == 0 else None,
+                collection=self.collection if i % 5 == 0 else None,
+                order=i % 2,
+            )
+            if i % 2:
+                CandleCategory.objects.create(candle=candle, category=self.wood)
+            if i % 6 == 0:
+                ProductOption.objects.create(product=candle, name="Розмір")
+
+    def _listing(self, **params):
+        data = get_product_list_data(self.factory.get("/products/", params))
+        return [(c.pk, c.has_options) for c in data["candles"]], data["paginator"].count
+
+    def test_snapshot_matches_orm_listing(self):
+        cases = [
+            {},
+            {"page": "2"},
+            {"sort": "price_asc"},
+            {"sort": "price_desc", "min_price": "150", "max_price": "300"},
+            {"sort": "name_asc", "category": str(self.wood.pk)},
+            {"group": str(self.group.pk), "collection": "calm"},
+            {"q": "свічка", "sort": "name_desc"},
+        ]
+        for params in cases:
+            expected = self._listing(**params)
+            with self.settings(CATALOG_SNAPSHOT=True):
+                self.assertEqual(self._listing(**params), expected, params)
+
+    @override_settings(CATALOG_SNAPSHOT=True)
+    def test_home_and_listing_use_one_query_per_page(self):
+        get_catalog_snapshot()
+        with self.assertNumQueries(1):
+            self._listing(sort="price_asc", category=str(self.wood.pk))
+        with self.assertNumQueries(3):  # candles + active banners + fallback banners
+            get_home_data()["candles"]
+
+    @override_settings(CATALOG_SNAPSHOT=True)
+    def test_snapshot_is_replaced_after_catalog_edit(self):
+        before = get_catalog_snapshot()
+        self.assertIs(get_catalog_snapshot(), before)
+        Candle.objects.create(name="Нова", description="", price=Decimal("1.00"))
+        after = get_catalog_snapshot()
+        self.assertIsNot(after, before)
+        self.assertEqual(len(after.records), len(before.records) + 1)
+
+    @override_settings(CATALOG_SNAPSHOT=True)
+    def test_price_bounds_match_exactly_like_the_orm(self):
+        candle = Candle.objects.create(
+            name="Округлення", description="", price=Decimal("99.99"), is_on_sale=True, discount_percent=15
+        )
+        pks = [pk for pk, _ in self._listing(max_price="84.99", min_price="84.99")[0]]
+        self.assertEqual(pks, [candle.pk])
+        self.assertIsNone(CatalogFilters.from_params(QueryDict("max_price=nan")).max_price)
+
+    @override_settings(CATALOG_SNAPSHOT=True)
+    def test_search_ids_missing_from_the_snapshot_are_skipped(self):
+        snapshot = get_catalog_snapshot()
+        known = next(iter(snapshot.records))
+        with mock.patch("shop.services.catalog_filters.search_candle_ids", return_value=[999999, known]):
+            with mock.patch("shop.services.product_service.get_catalog_snapshot", return_value=snapshot):
+                listing, count = self._listing(q="свічка")
+        self.assertEqual(([pk for pk, _ in listing], count), ([known], 1))
+
+    @override_settings(CATALOG_SNAPSHOT=True)
+    def test_name_orderings_use_the_database_collation(self):
+        with mock.patch("shop.services.product_service.get_catalog_snapshot") as get_snapshot:
+            self._listing(sort="name_asc")
+            self._listing(sort="name_desc")
+        get_snapshot.assert_not_called()
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from shop.checks import check_shared_cache
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+FILE_CACHE = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp/shop-cache"}}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(CACHES=LOCMEM, DEBUG=False, IS_PROD=True)
+    def test_process_local_cache_fails_in_production(self):
+        self.assertEqual([e.id for e in check_shared_cache(None)], ["shop.E001"])
+
+    @override_settings(CACHES=LOCMEM, DEBUG=False, IS_PROD=False)
+    def test_process_local_cache_warns_outside_debug(self):
+        self.assertEqual([e.id for e in check_shared_cache(None)], ["shop.W001"])
+
+    @override_settings(CACHES=LOCMEM, DEBUG=True)
+    def test_debug_is_allowed_a_local_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES=FILE_CACHE, DEBUG=False, IS_PROD=True)
+    def test_shared_cache_passes(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+
+class DeployCheckTests(SimpleTestCase):
+    """Runs the CI job "Django deploy check (production settings)"."""
+
+    CI_ENV = {
+        "DJANGO_ENV": "production",
+        "DJANGO_DEBUG": "False",
+        "DJANGO_SECRET_KEY": "ci-only-production-secret-key-please-replace-yyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyyy",
+        "ALLOWED_HOSTS": "example.com",
+    }
+
+    def _deploy_check(self, **env):
+        return subprocess.run(
+            [sys.executable, "manage.py", "check", "--deploy"],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **self.CI_ENV, **env},
+            capture_output=True,
+            text=True,
+        )
+
+    def test_ci_deploy_check_passes(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            result = self._deploy_check(DJANGO_CACHE_DIR=cache_dir)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_deploy_check_fails_without_shared_cache(self):
+        env = {k: v for k, v in os.environ.items() if k != "DJANGO_CACHE_DIR"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            result = self._deploy_check()
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn("shop.E001", result.stderr)
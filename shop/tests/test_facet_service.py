@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shop.models import Candle, CandleCategory, Category, CategoryGroup
+from shop.services.catalog_filters import CatalogFilters
+from shop.services.facet_service import get_catalog_facets
+
+
+class FacetServiceTests(TestCase):
+    def setUp(self):
+        group = CategoryGroup.objects.create(name="Аромати")
+        self.wood = Category.objects.create(name="Деревні", group=group)
+        self.flower = Category.objects.create(name="Квіткові", group=group)
+        self.group = group
+        for price, category in ((Decimal("250.00"), self.wood), (Decimal("450.00"), self.wood), (Decimal("1200.00"), self.flower)):
+            candle = Candle.objects.create(name="Свічка", description="", price=price)
+            CandleCategory.objects.create(candle=candle, category=category)
+
+    def _facets(self, query=""):
+        return get_catalog_facets(CatalogFilters.from_params(QueryDict(query)))
+
+    def test_counts_per_dimension(self):
+        facets = self._facets()
+        self.assertEqual(facets["categories"], {self.wood.pk: 2, self.flower.pk: 1})
+        self.assertEqual(facets["groups"], {self.group.pk: 3})
+        self.assertEqual([b["count"] for b in facets["price_buckets"]], [1, 1, 0, 1])
+
+    def test_dimension_ignores_its_own_filter(self):
+        facets = self._facets(f"category={self.wood.pk}&max_price=300")
+        # categories are counted without the category filter, prices without the price filter
+        self.assertEqual(facets["categories"], {self.wood.pk: 1})
+        self.assertEqual([b["count"] for b in facets["price_buckets"]], [1, 1, 0, 0])
+
+    def test_facets_are_cached_until_catalog_changes(self):
+        self._facets()
+        with self.assertNumQueries(0):
+            self._facets()
+        Candle.objects.create(name="Нова", description="", price=Decimal("100.00"))
+        self.assertEqual(self._facets()["price_buckets"][0]["count"], 2)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProductListFacetsTests(TestCase):
+    def test_empty_category_is_disabled(self):
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "uk"
+        used = Category.objects.create(name="Є товари")
+        empty = Category.objects.create(name="Порожня")
+        candle = Candle.objects.create(name="Свічка", description="", price=Decimal("100.00"))
+        CandleCategory.objects.create(candle=candle, category=used)
+        html = self.client.get(reverse("product_list")).content.decode()
+        self.assertIn(f'<option value="{used.pk}" >Є товари (1)</option>', html)
+        self.assertIn(f'<option value="{empty.pk}" disabled>Порожня (0)</option>', html)
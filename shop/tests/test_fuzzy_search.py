@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+
+from shop.models import Candle, CandleCategory, Category
+from shop.services.fuzzy_search import fold_word, get_trigram_index
+from shop.services.product_service import get_product_list_data
+
+
+class FoldWordTests(TestCase):
+    def test_ukrainian_russian_and_latin_spellings_fold_together(self):
+        self.assertEqual(fold_word("Ваніль"), fold_word("ваниль"))
+        self.assertEqual(fold_word("ваниль"), fold_word("vanil"))
+        self.assertEqual(fold_word("Лаванда"), fold_word("lavanda"))
+        self.assertEqual(fold_word("Шоколад"), fold_word("shokolad"))
+
+
+@override_settings(CATALOG_SEARCH="fuzzy")
+class FuzzySearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.lavender = Candle.objects.create(name="Лаванда", name_ru="Лаванда", description="", price=Decimal("100.00"))
+        self.vanilla = Candle.objects.create(name="Ваніль і кокос", name_ru="Ваниль и кокос", description="", price=Decimal("100.00"))
+        self.cedar = Candle.objects.create(name="Кедр", description="", price=Decimal("100.00"))
+        woody = Category.objects.create(name="Деревні", name_ru="Древесные")
+        CandleCategory.objects.create(candle=self.cedar, category=woody)
+
+    def _search(self, q):
+        return [c.pk for c in get_product_list_data(RequestFactory().get("/products/", {"q": q}))["candles"]]
+
+    def test_transliterated_and_cross_language_queries(self):
+        self.assertEqual(self._search("lavanda"), [self.lavender.pk])
+        self.assertEqual(self._search("ваниль"), [self.vanilla.pk])
+        self.assertEqual(self._search("vanil kokos"), [self.vanilla.pk])
+
+    def test_typos_and_started_words(self):
+        self.assertEqual(self._search("лавнда"), [self.lavender.pk])
+        self.assertEqual(self._search("lav"), [self.lavender.pk])
+
+    def test_category_names_are_searched(self):
+        self.assertEqual(self._search("древесные"), [self.cedar.pk])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self._search("лаванда кокос"), [])
+        self.assertEqual(self._search("троянда"), [])
+
+    def test_index_is_rebuilt_after_catalog_edit(self):
+        before = get_trigram_index()
+        self.assertIs(get_trigram_index(), before)
+        rose = Candle.objects.create(name="Троянда", description="", price=Decimal("100.00"))
+        self.assertEqual(self._search("troianda"), [rose.pk])
+        self.assertIsNot(get_trigram_index(), before)
@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import translation
+
+from shop.models import Candle, Collection, CollectionItem, ProductOption
+from shop.services.collection_service import get_collection_detail_data
+from shop.services.listing_service import card_values, to_cards
+from shop.services.product_service import get_product_list_data
+
+
+class ListingProjectionTests(TestCase):
+    def setUp(self):
+        self.candle = Candle.objects.create(
+            name="Кедр",
+            name_ru="Кедр ру",
+            description="Довгий опис " * 100,
+            description_ru="Длинное описание " * 100,
+            price=Decimal("200.00"),
+            is_on_sale=True,
+            discount_percent=25,
+            image="candles/cedar.jpg",
+        )
+        ProductOption.objects.create(product=self.candle, name="Розмір")
+
+    def test_cards_are_resolved_for_the_active_language(self):
+        with translation.override("ru"):
+            [card] = to_cards(card_values(Candle.objects.all()))
+        self.assertEqual(card.pk, self.candle.pk)
+        self.assertEqual(card.display_name, "Кедр ру")
+        self.assertEqual(card.discounted_price, Decimal("150.00"))
+        self.assertEqual(card.effective_price, Decimal("150.00"))
+        self.assertTrue(card.has_options)
+        self.assertTrue(card.image_url.endswith("candles/cedar.jpg"))
+
+    def test_listing_does_not_load_descriptions(self):
+        with CaptureQueriesContext(connection) as ctx:
+            candles = list(get_product_list_data(RequestFactory().get("/products/"))["candles"])
+        self.assertEqual([c.pk for c in candles], [self.candle.pk])
+        self.assertFalse(any('"description' in q["sql"] for q in ctx.captured_queries))
+
+    def test_collection_cards_carry_a_short_description(self):
+        collection = Collection.objects.create(code="calm", title_uk="Спокій")
+        CollectionItem.objects.create(collection=collection, candle=self.candle)
+        with translation.override("uk"):
+            [card] = get_collection_detail_data(collection)["candles"]
+        self.assertTrue(card.display_description.startswith("Довгий опис"))
+        self.assertLess(len(card.display_description), len(self.candle.description))
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shop.models import Candle
+
+
+@override_settings(PAGE_CACHE=True, CART_BADGE_ASYNC=True, SECURE_SSL_REDIRECT=False)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "uk"
+        self.candle = Candle.objects.create(name="Кедр", description="", price=Decimal("90.00"))
+
+    def test_second_request_is_served_from_cache(self):
+        url = reverse("product_list")
+        first = self.client.get(url, {"sort": "name_asc", "utm_source": "x"})
+        self.assertEqual(first["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"sort": "name_asc"})
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_conditional_request_gets_304(self):
+        url = reverse("product_detail", args=[self.candle.pk])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_edit_invalidates_pages(self):
+        url = reverse("home")
+        self.client.get(url)
+        self.candle.name = "Кедр новий"
+        self.candle.save()
+        response = self.client.get(url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn("Кедр новий", response.content.decode())
+
+    def test_languages_are_cached_separately(self):
+        url = reverse("home")
+        self.client.get(url)
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "ru"
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+    @override_settings(CART_BADGE_ASYNC=False)
+    def test_disabled_without_async_badge(self):
+        self.assertNotIn("X-Cache", self.client.get(reverse("home")))
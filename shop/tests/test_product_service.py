@@ -0,0 +1,202 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from shop.models import Candle, CandleCategory, Category, Collection, CollectionItem, ProductOption
+from shop.services.catalog_service import get_catalog_version
+from shop.services.collection_service import get_collection_detail_data
+from shop.services.product_service import PRODUCTS_PER_PAGE, get_home_data, get_product_list_data
+
+
+class HasOptionsAnnotationTests(TestCase):
+    def setUp(self):
+        self.plain = Candle.objects.create(name="Проста", description="", price=Decimal("100.00"))
+        self.with_options = Candle.objects.create(name="З опціями", description="", price=Decimal("100.00"))
+        ProductOption.objects.create(product=self.with_options, name="Розмір")
+
+    def test_home_candles_carry_has_options(self):
+        with self.assertNumQueries(4):
+            candles = {c.pk: c.has_options for c in get_home_data()["candles"]}
+        self.assertEqual(candles, {self.plain.pk: False, self.with_options.pk: True})
+
+    def test_collection_items_carry_has_options(self):
+        collection = Collection.objects.create(code="calm", title_uk="Спокій")
+        CollectionItem.objects.create(collection=collection, candle=self.plain)
+        CollectionItem.objects.create(collection=collection, candle=self.with_options)
+        with self.assertNumQueries(1):
+            candles = {c.pk: c.has_options for c in get_collection_detail_data(collection)["candles"]}
+        self.assertEqual(candles, {self.plain.pk: False, self.with_options.pk: True})
+
+
+@override_settings(CATALOG_PAGINATION="cursor")
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        for i in range(PRODUCTS_PER_PAGE + 5):
+            Candle.objects.create(
+                name=f"Свічка {i:02d}",
+                description="",
+                price=Decimal("100.00") + i % 3,
+                is_hit=i % 4 == 0,
+            )
+
+    def _page(self, **params):
+        return get_product_list_data(self.factory.get("/products/", params))["cursor_page"]
+
+    def _walk(self, **params):
+        seen = []
+        page = self._page(**params)
+        while True:
+            seen.extend(c.pk for c in page)
+            if not page.has_next():
+                return seen, page
+            page = self._page(cursor=page.next_cursor, **params)
+
+    def test_pages_match_offset_pagination_order(self):
+        for sort in ("", "price_desc", "name_asc"):
+            seen, _ = self._walk(sort=sort)
+            with self.settings(CATALOG_PAGINATION="page"):
+                paginator = get_product_list_data(self.factory.get("/products/", {"sort": sort}))["paginator"]
+            self.assertEqual(seen, [row.id for row in paginator.object_list], sort)
+
+    def test_previous_cursor_returns_first_page(self):
+        first = self._page(sort="name_asc")
+        self.assertFalse(first.has_previous())
+        second = self._page(sort="name_asc", cursor=first.next_cursor)
+        self.assertTrue(second.has_previous())
+        back = self._page(sort="name_asc", cursor=second.previous_cursor)
+        self.assertEqual([c.pk for c in back], [c.pk for c in first])
+        self.assertTrue(back.has_next())
+
+    def test_no_count_query_and_foreign_cursor_ignored(self):
+        first = self._page(sort="price_asc")
+        with CaptureQueriesContext(connection) as ctx:
+            page = self._page(sort="name_asc", cursor=first.next_cursor)
+        self.assertFalse(any("__count" in q["sql"] for q in ctx.captured_queries))
+        self.assertFalse(page.has_previous())
+
+
+class CountCacheTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        for i in range(PRODUCTS_PER_PAGE + 1):
+            Candle.objects.create(name=f"Свічка {i}", description="", price=Decimal("100.00"))
+
+    def _count(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            count = get_product_list_data(self.factory.get("/products/", params))["paginator"].count
+        return count, sum("__count" in q["sql"] for q in ctx.captured_queries)
+
+    def test_count_is_computed_once_per_filter_combination(self):
+        self.assertEqual(self._count(min_price="50"), (PRODUCTS_PER_PAGE + 1, 1))
+        self.assertEqual(self._count(min_price="50.0", page="2", sort="name_asc"), (PRODUCTS_PER_PAGE + 1, 0))
+        self.assertEqual(self._count(min_price="150"), (0, 1))
+
+    def test_catalog_change_invalidates_count(self):
+        self._count()
+        Candle.objects.create(name="Нова", description="", price=Decimal("100.00"))
+        self.assertEqual(self._count(), (PRODUCTS_PER_PAGE + 2, 1))
+
+
+class SortPriorityTests(TestCase):
+    def test_column_follows_flags_including_bulk_updates(self):
+        candle = Candle.objects.create(name="Свічка", description="", price=Decimal("100.00"), is_hit=True, is_on_sale=True)
+        self.assertEqual(Candle.objects.get(pk=candle.pk).sort_priority, 0)
+        Candle.objects.update(is_hit=False, is_on_sale=False)
+        self.assertEqual(Candle.objects.get(pk=candle.pk).sort_priority, 3)
+
+
+class EffectivePriceTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.sale = Candle.objects.create(
+            name="Знижка", description="", price=Decimal("300.00"), is_on_sale=True, discount_percent=50
+        )
+        self.regular = Candle.objects.create(name="Звичайна", description="", price=Decimal("200.00"))
+
+    def _pks(self, **params):
+        return [c.pk for c in get_product_list_data(self.factory.get("/products/", params))["candles"]]
+
+    def test_column_matches_discounted_price(self):
+        self.assertEqual(Candle.objects.get(pk=self.sale.pk).effective_price, self.sale.discounted_price())
+        Candle.objects.update(is_on_sale=False)
+        self.assertEqual(Candle.objects.get(pk=self.sale.pk).effective_price, Decimal("300.00"))
+
+    def test_column_and_discounted_price_round_to_kopecks_alike(self):
+        for price, percent, expected in [("99.99", 15, "84.99"), ("99.90", 15, "84.92"), ("10.05", 50, "5.03")]:
+            candle = Candle.objects.create(
+                name="Округлення", description="", price=Decimal(price), is_on_sale=True, discount_percent=percent
+            )
+            candle = Candle.objects.get(pk=candle.pk)
+            self.assertEqual(candle.discounted_price(), Decimal(expected))
+            self.assertEqual(candle.effective_price, Decimal(expected))
+            self.assertTrue(Candle.objects.filter(pk=candle.pk, effective_price__lte=Decimal(expected)).exists())
+
+    def test_filter_and_sort_use_discounted_price(self):
+        self.assertEqual(self._pks(max_price="160"), [self.sale.pk])
+        self.assertEqual(self._pks(sort="price_asc"), [self.sale.pk, self.regular.pk])
+
+
+class MultiCategoryFilterTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.wood = Category.objects.create(name="Деревні")
+        self.fresh = Category.objects.create(name="Свіжі")
+        self.both = Candle.objects.create(name="Кедр і мʼята", description="", price=Decimal("100.00"))
+        self.woody = Candle.objects.create(name="Кедр", description="", price=Decimal("100.00"))
+        self.minty = Candle.objects.create(name="Мʼята", description="", price=Decimal("100.00"))
+        Candle.objects.create(name="Без категорії", description="", price=Decimal("100.00"))
+        for candle, category in [(self.both, self.wood), (self.both, self.fresh), (self.woody, self.wood), (self.minty, self.fresh)]:
+            CandleCategory.objects.create(candle=candle, category=category)
+
+    def _pks(self, query):
+        request = self.factory.get(f"/products/?{query}&sort=name_asc")
+        with CaptureQueriesContext(connection) as ctx:
+            pks = [c.pk for c in get_product_list_data(request)["candles"]]
+        self.assertFalse(any("DISTINCT" in q["sql"] and "shop_candle" in q["sql"] and "COUNT" not in q["sql"] for q in ctx.captured_queries))
+        return pks
+
+    def test_any_and_all_modes(self):
+        ids = f"category={self.wood.pk}&category={self.fresh.pk}"
+        self.assertEqual(self._pks(ids), [self.woody.pk, self.both.pk, self.minty.pk])
+        self.assertEqual(self._pks(f"{ids}&category_mode=all"), [self.both.pk])
+        self.assertEqual(self._pks(f"category={self.wood.pk}&category_mode=all"), [self.woody.pk, self.both.pk])
+
+    def test_snapshot_gives_the_same_results(self):
+        for query in (
+            f"category={self.wood.pk}&category={self.fresh.pk}",
+            f"category={self.wood.pk}&category={self.fresh.pk}&category_mode=all",
+        ):
+            expected = self._pks(query)
+            with self.settings(CATALOG_SNAPSHOT=True):
+                self.assertEqual(self._pks(query), expected, query)
+
+
+
+class BulkUpdateCommandTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.sale = Candle.objects.create(
+            name="Знижка", description="", price=Decimal("300.00"), is_on_sale=True, discount_percent=50, is_hit=True
+        )
+
+    def _pks(self, **params):
+        return [c.pk for c in get_product_list_data(self.factory.get("/products/", params))["candles"]]
+
+    def test_commands_bump_the_catalog_version(self):
+        for command in ("remove_hits_and_sales", "clear_hits_sales", "reset_order", "remove_order"):
+            with self.subTest(command=command):
+                before = get_catalog_version()
+                call_command(command, stdout=StringIO())
+                self.assertNotEqual(get_catalog_version(), before)
+
+    @override_settings(CATALOG_SNAPSHOT=True)
+    def test_removed_discount_reaches_the_snapshot_listing(self):
+        self.assertEqual(self._pks(max_price="160"), [self.sale.pk])
+        call_command("remove_hits_and_sales", stdout=StringIO())
+        self.assertEqual(self._pks(max_price="160"), [])
+        self.assertEqual(self._pks(min_price="300"), [self.sale.pk])
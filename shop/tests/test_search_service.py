@@ -0,0 +1,60 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from shop.models import Candle, CandleCategory, Category
+from shop.services.search_service import search_candle_ids
+
+
+class SearchServiceTests(TestCase):
+    def setUp(self):
+        self.lavender = Candle.objects.create(
+            name="Лаванда", name_ru="Лаванда", description="Свеча с ароматом лаванды", price=Decimal("100.00")
+        )
+        self.vanilla = Candle.objects.create(
+            name="Ваніль", name_ru="Ваниль", description="Солодкий аромат", price=Decimal("120.00")
+        )
+
+    def test_document_combines_languages_and_categories(self):
+        category = Category.objects.create(name="Зимові", name_ru="Зимние")
+        CandleCategory.objects.create(candle=self.vanilla, category=category)
+        self.vanilla.refresh_from_db()
+        self.assertIn("Ваниль", self.vanilla.search_document)
+        self.assertIn("Зимние", self.vanilla.search_document)
+
+    def test_ranked_prefix_search(self):
+        self.assertEqual(search_candle_ids("лаванд"), [self.lavender.pk])
+        self.assertEqual(search_candle_ids("ваниль"), [self.vanilla.pk])
+
+    def test_index_follows_category_and_candle_changes(self):
+        category = Category.objects.create(name="Подарунки", name_ru="Подарки")
+        self.lavender.categories.add(category)
+        self.assertEqual(search_candle_ids("подарки"), [self.lavender.pk])
+
+        category.name_ru = "Сувениры"
+        category.save()
+        self.assertEqual(search_candle_ids("подарки"), [])
+        self.assertEqual(search_candle_ids("сувениры"), [self.lavender.pk])
+
+        self.lavender.delete()
+        self.assertEqual(search_candle_ids("сувениры"), [])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class ProductListSearchTests(TestCase):
+    def setUp(self):
+        self.client.cookies[settings.LANGUAGE_COOKIE_NAME] = "uk"
+        self.match = Candle.objects.create(name="Кедр", description="Хвойний", price=Decimal("90.00"))
+        Candle.objects.create(name="Троянда", description="Квітковий", price=Decimal("90.00"))
+
+    def test_search_uses_index(self):
+        response = self.client.get(reverse("product_list"), {"q": "кедр"})
+        self.assertEqual([c.pk for c in response.context["candles"]], [self.match.pk])
+
+    def test_search_falls_back_to_substring(self):
+        with mock.patch("shop.services.catalog_filters.search_candle_ids", return_value=None):
+            response = self.client.get(reverse("product_list"), {"q": "едр"})
+        self.assertEqual([c.pk for c in response.context["candles"]], [self.match.pk])
@@ -42,6 +42,23 @@ class SmokeCartCheckoutTests(TestCase):
         self.assertEqual(resp2.status_code, 200)
         self.assertContains(resp2, candle.display_name())
 
+    def test_batch_endpoint_updates_cart(self):
+        candle = self._create_candle()
+
+        resp = self.client.post(
+            reverse("cart_batch"),
+            data=json.dumps({"operations": [
+                {"op": "add", "pk": candle.pk, "qty": 2},
+                {"op": "set", "key": str(candle.pk), "qty": 5},
+            ]}),
+            content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json().get("items"), 5)
+
+        resp2 = self.client.get(reverse("cart_view"))
+        self.assertEqual(resp2.context["cart_count"], 5)
+
     def test_checkout_creates_order(self):
         candle = self._create_candle()
 
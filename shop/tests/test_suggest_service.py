@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+from shop.models import Candle, Category, Scent
+from shop.services.suggest_service import get_prefix_index, suggest
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class SuggestTests(TestCase):
+    def setUp(self):
+        self.candle = Candle.objects.create(
+            name="Свічка з лавандою", name_ru="Свеча с лавандой", description="", price=Decimal("100.00")
+        )
+        self.category = Category.objects.create(name="Лавандові", name_ru="Лавандовые")
+        self.scent = Scent.objects.create(name="Лаванда", name_ru="Лаванда")
+
+    def test_matches_word_prefixes_in_both_languages(self):
+        with translation.override("ru"):
+            results = suggest("лаванд")
+        self.assertEqual(
+            [(r["type"], r["label"]) for r in results],
+            [("candle", "Свеча с лавандой"), ("category", "Лавандовые"), ("scent", "Лаванда")],
+        )
+        with translation.override("uk"):
+            self.assertEqual(suggest("свеч")[0]["label"], "Свічка з лавандою")
+
+    def test_answered_without_database_until_catalog_changes(self):
+        get_prefix_index()
+        with self.assertNumQueries(0):
+            self.assertEqual(suggest("кедр"), [])
+        Candle.objects.create(name="Кедр", description="", price=Decimal("100.00"))
+        self.assertEqual([r["label"] for r in suggest("кед")], ["Кедр"])
+
+    def test_endpoint(self):
+        response = self.client.get(reverse("suggest"), {"q": "Лав"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 3)
+        self.assertEqual(self.client.post(reverse("suggest"), {"q": "Лав"}).status_code, 405)
@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import home, product_list, product_detail, add_to_cart, cart_view, update_cart, checkout, get_nova_poshta_warehouses, privacy_policy, collection_detail, scent_list, scent_detail
+from .views import home, product_list, product_detail, add_to_cart, cart_view, update_cart, batch_cart, cart_summary, checkout, get_nova_poshta_warehouses, suggest, api_product_list, api_product_detail, privacy_policy, collection_detail, scent_list, scent_detail
 
 urlpatterns = [
     path('', home, name='home'),
@@ -11,7 +11,12 @@ urlpatterns = [
     path('cart/add/', add_to_cart, name='cart_add'),
     path('cart/', cart_view, name='cart_view'),
     path('cart/update/', update_cart, name='cart_update'),
+    path('cart/batch/', batch_cart, name='cart_batch'),
+    path('cart/summary/', cart_summary, name='cart_summary'),
     path('checkout/', checkout, name='checkout'),
+    path('api/suggest/', suggest, name='suggest'),
+    path('api/products/', api_product_list, name='api_product_list'),
+    path('api/products/<int:pk>/', api_product_detail, name='api_product_detail'),
     path('api/nova-poshta-warehouses/', get_nova_poshta_warehouses, name='nova_poshta_warehouses'),
     path('collection/<str:code>/', collection_detail, name='collection_detail'),
 ]
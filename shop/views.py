@@ -4,15 +4,25 @@ import logging
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
 from django.utils import translation
-from django.views.decorators.http import require_POST
+from django.views.decorators.cache import cache_control, never_cache
+from django.views.decorators.csrf import ensure_csrf_cookie
+from django.views.decorators.http import etag, require_GET, require_POST
 
 from .models import Candle, Collection, Scent
+from .page_cache import cache_catalog_page
+from .services.catalog_api import (
+    product_detail_etag,
+    product_detail_payload,
+    product_list_etag,
+    product_list_payload,
+)
 from .services.cart_service import (
     add_to_cart as add_to_cart_item,
-    build_cart_items,
-    get_cart_count,
+    apply_cart_batch,
+    resolve_cart,
     update_cart as update_cart_item,
 )
+from .services.cart_store import CartStoreFull, get_cart_store
 from .services.collection_service import get_collection_detail_data
 from .services.delivery_service import get_nova_poshta_warehouses as fetch_nova_poshta_warehouses
 from .services.order_service import create_order_with_items
@@ -22,6 +32,7 @@ from .services.product_service import (
     get_product_list_data,
 )
 from .services.scent_service import get_scent_detail_data, get_scent_list_data
+from .services.suggest_service import suggest as find_suggestions
 from .services.telegram_service import (
     telegram_format_order_message,
     telegram_send_message,
@@ -30,44 +41,51 @@ from .services.telegram_service import (
 logger = logging.getLogger(__name__)
 
 
+@cache_catalog_page
 def home(request):
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
     data = get_home_data()
     lang = (translation.get_language() or 'uk')[:2]
     template = f'shop/home_{lang}.html'
     return render(request, template, {
         **data,
-        'cart_count': cart_count,
     })
 
 
+@cache_catalog_page
 def product_list(request):
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
     data = get_product_list_data(request)
     lang = (translation.get_language() or 'uk')[:2]
     template = f'shop/product_list_{lang}.html'
     return render(request, template, {
         **data,
-        'cart_count': cart_count,
     })
 
 
+@cache_catalog_page
 def product_detail(request, pk):
     candle = get_object_or_404(Candle, pk=pk)
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
     data = get_product_detail_data(candle)
     lang = (translation.get_language() or 'uk')[:2]
     template = f'shop/product_detail_{lang}.html'
     return render(request, template, {
         'candle': candle,
         **data,
-        'cart_count': cart_count,
     })
 
 
+def _save_cart_response(store, cart, payload, status):
+    response = JsonResponse(payload, status=status)
+    try:
+        store.save(cart, response)
+    except CartStoreFull:
+        return JsonResponse({
+            'ok': False,
+            'error': 'cart_full',
+            'message': 'Корзина переполнена',
+        }, status=400)
+    return response
+
+
 @require_POST
 def add_to_cart(request):
     try:
@@ -87,24 +105,21 @@ def add_to_cart(request):
             'message': 'Товара нет в наличии'
         }, status=400)
 
-    cart = request.session.get('cart', {})
-    cart, response, status = add_to_cart_item(cart, candle, qty, selected_options)
+    store = get_cart_store(request)
+    cart, response, status = add_to_cart_item(store.load(), candle, qty, selected_options)
     if not response.get('ok'):
         return JsonResponse(response, status=status)
 
-    request.session['cart'] = cart
-    request.session.modified = True
-    return JsonResponse(response, status=status)
+    return _save_cart_response(store, cart, response, status)
 
 
 def cart_view(request):
-    cart = request.session.get('cart', {})
-    items, total = build_cart_items(cart)
-    cart_count = get_cart_count(cart)
+    cart = get_cart_store(request).load()
+    snapshot = resolve_cart(cart)
 
     lang = (translation.get_language() or 'uk')[:2]
     template = f'shop/cart_{lang}.html'
-    return render(request, template, {'items': items, 'total': total, 'cart_count': cart_count})
+    return render(request, template, {'items': snapshot.items, 'total': snapshot.total})
 
 
 @require_POST
@@ -117,21 +132,37 @@ def update_cart(request):
     except Exception:
         return JsonResponse({'ok': False, 'error': 'invalid payload'}, status=400)
 
-    cart = request.session.get('cart', {})
-    cart, response, status = update_cart_item(cart, cart_key, action, qty)
-    if response.get('ok'):
-        request.session['cart'] = cart
-        request.session.modified = True
+    store = get_cart_store(request)
+    cart, response, status = update_cart_item(store.load(), cart_key, action, qty)
+    if not response.get('ok'):
+        return JsonResponse(response, status=status)
+
+    return _save_cart_response(store, cart, response, status)
+
+
+@require_POST
+def batch_cart(request):
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+        operations = data.get('operations')
+    except Exception:
+        return JsonResponse({'ok': False, 'error': 'invalid payload'}, status=400)
+
+    store = get_cart_store(request)
+    cart, response, status = apply_cart_batch(store.load(), operations)
+    if not response.get('ok'):
+        return JsonResponse(response, status=status)
 
-    return JsonResponse(response, status=status)
+    return _save_cart_response(store, cart, response, status)
 
 
 def checkout(request):
     from .forms import OrderForm
 
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
-    items, total = build_cart_items(cart)
+    store = get_cart_store(request)
+    cart = store.load()
+    snapshot = resolve_cart(cart)
+    items, total = snapshot.items, snapshot.total
 
     lang = (translation.get_language() or 'uk')[:2]
 
@@ -156,12 +187,9 @@ def checkout(request):
                     'form': form,
                     'items': items,
                     'total': total,
-                    'cart_count': cart_count
                 })
 
             order = create_order_with_items(form, items, warehouse)
-            request.session['cart'] = {}
-            request.session.modified = True
 
             try:
                 logger.info('Preparing Telegram notification for order %s', order.id)
@@ -172,14 +200,15 @@ def checkout(request):
             except Exception:
                 logger.exception('Error sending Telegram notification for order %s', order.id)
 
-            return render(request, f'shop/order_success_{lang}.html', {'order': order, 'cart_count': 0})
+            response = render(request, f'shop/order_success_{lang}.html', {'order': order, 'cart_count': 0})
+            store.clear(response)
+            return response
         else:
             template = f'shop/checkout_{lang}.html'
             return render(request, template, {
                 'form': form,
                 'items': items,
                 'total': total,
-                'cart_count': cart_count
             })
     else:
         form = apply_ru_placeholders(OrderForm())
@@ -189,30 +218,63 @@ def checkout(request):
         'form': form,
         'items': items,
         'total': total,
-        'cart_count': cart_count
     })
 
 
+@never_cache
+@ensure_csrf_cookie
+def cart_summary(request):
+    summary = get_cart_store(request).summary()
+    return JsonResponse({
+        'ok': True,
+        'items': summary.count,
+        'total': str(summary.total) if summary.total is not None else None,
+    })
+
+
+@require_GET
+def suggest(request):
+    """Search-as-you-type: answered from the in-memory prefix index."""
+    query = request.GET.get('q', '')[:100]
+    return JsonResponse({'ok': True, 'results': find_suggestions(query)})
+
+
+# Catalog JSON: clients revalidate every time (no-cache) and get a 304 while
+# the catalog version, language and filters are unchanged.
+@require_GET
+@cache_control(no_cache=True)
+@etag(product_list_etag)
+def api_product_list(request):
+    data = get_product_list_data(request, render_cards=False)
+    return JsonResponse(product_list_payload(data))
+
+
+@require_GET
+@cache_control(no_cache=True)
+@etag(product_detail_etag)
+def api_product_detail(request, pk):
+    candle = get_object_or_404(Candle, pk=pk)
+    return JsonResponse(product_detail_payload(candle, get_product_detail_data(candle)))
+
+
 def get_nova_poshta_warehouses(request):
     city = request.GET.get('city', '').strip()
     warehouses = fetch_nova_poshta_warehouses(city)
     return JsonResponse({'warehouses': warehouses})
 
 
+@cache_catalog_page
 def privacy_policy(request):
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
     lang = (translation.get_language() or 'uk')[:2]
     template = f'shop/privacy_{lang}.html'
     contact_email = ''
-    return render(request, template, {'cart_count': cart_count, 'contact_email': contact_email})
+    return render(request, template, {'contact_email': contact_email})
 
 
+@cache_catalog_page
 def collection_detail(request, code):
     collection = get_object_or_404(Collection, code=code)
     data = get_collection_detail_data(collection)
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
 
     lang = translation.get_language() or 'uk'
     if lang.startswith('ru'):
@@ -222,32 +284,27 @@ def collection_detail(request, code):
 
     return render(request, template, {
         **data,
-        'cart_count': cart_count,
     })
 
 
+@cache_catalog_page
 def scent_list(request):
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
     data = get_scent_list_data(request)
     lang = (translation.get_language() or 'uk')[:2]
     template = f'shop/scent_{lang}.html'
     return render(request, template, {
         **data,
-        'cart_count': cart_count,
     })
 
 
+@cache_catalog_page
 def scent_detail(request, pk: int):
     scent = get_object_or_404(Scent, pk=pk)
 
-    cart = request.session.get('cart', {})
-    cart_count = get_cart_count(cart)
     data = get_scent_detail_data(scent)
 
     lang = (translation.get_language() or 'uk')[:2]
     template = f'shop/scent_detail_{lang}.html'
     return render(request, template, {
         **data,
-        'cart_count': cart_count,
     })
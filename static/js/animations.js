@@ -309,6 +309,45 @@ const isMobile = window.matchMedia('(max-width: 768px)').matches;
     });
 })();
 
+// Search suggestions (/api/suggest/, answered from an in-memory index)
+(function(){
+    const input = document.querySelector('.search-modal__input[data-suggest-url]');
+    if(!input) return;
+    const url = input.getAttribute('data-suggest-url');
+    const list = document.createElement('ul');
+    list.className = 'search-suggest';
+    list.hidden = true;
+    input.closest('.search-modal__panel').appendChild(list);
+
+    let timer = null;
+    let seq = 0;
+    function render(results){
+        list.innerHTML = '';
+        results.forEach(function(item){
+            const li = document.createElement('li');
+            const a = document.createElement('a');
+            a.href = item.url;
+            a.textContent = item.label;
+            a.className = 'search-suggest__item search-suggest__item--' + item.type;
+            li.appendChild(a);
+            list.appendChild(li);
+        });
+        list.hidden = !results.length;
+    }
+    input.addEventListener('input', function(){
+        clearTimeout(timer);
+        const q = input.value.trim();
+        if(!q){ render([]); return; }
+        timer = setTimeout(function(){
+            const current = ++seq;
+            fetch(url + '?q=' + encodeURIComponent(q), {headers: {'Accept': 'application/json'}})
+                .then(r=>r.json()).then(data=>{
+                    if(current === seq && data && data.ok) render(data.results);
+                }).catch(()=>{});
+        }, 60);
+    });
+})();
+
 // Mobile bottom navigation (categories shortcut)
 (function(){
     document.addEventListener('click', function(e){
@@ -430,6 +469,53 @@ document.addEventListener('click', function(e){
 });
 })();
 
+/* Async cart badge: pages rendered with CART_BADGE_ASYNC carry no per-user data,
+   so the header count (and the CSRF token for forms) is fetched separately */
+(function(){
+    const badge = document.getElementById('cart-count');
+    const url = badge && badge.getAttribute('data-summary-url');
+    if(!url) return;
+    fetch(url, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+        .then(r=>r.json()).then(data=>{
+            if(data && data.ok) badge.textContent = data.items;
+            const m = document.cookie.match('(^|;)\\s*csrftoken\\s*=\\s*([^;]+)');
+            const token = m ? m.pop() : '';
+            document.querySelectorAll('input[data-csrf-cookie]').forEach(function(el){ el.value = token; });
+        }).catch(()=>{});
+})();
+
+/* Catalog "load more" (CATALOG_PAGINATION=cursor): fetches the next keyset page
+   and appends its cards instead of navigating; the link still works without JS */
+(function(){
+    document.addEventListener('click', function(e){
+        const link = e.target.closest('[data-load-more-link]');
+        if(!link) return;
+        const grid = document.querySelector('.grid');
+        if(!grid) return;
+        e.preventDefault();
+        if(link.getAttribute('aria-busy') === 'true') return;
+        link.setAttribute('aria-busy', 'true');
+        fetch(link.href, {credentials: 'same-origin'})
+            .then(r=>r.text()).then(html=>{
+                const doc = new DOMParser().parseFromString(html, 'text/html');
+                const newGrid = doc.querySelector('.grid');
+                if(newGrid){
+                    Array.from(newGrid.children).forEach(function(card){
+                        card.classList.add('is-visible');
+                        grid.appendChild(card);
+                    });
+                }
+                const next = doc.querySelector('[data-load-more-link]');
+                if(next){
+                    link.href = next.getAttribute('href');
+                    link.removeAttribute('aria-busy');
+                } else {
+                    link.remove();
+                }
+            }).catch(()=>{ window.location.href = link.href; });
+    });
+})();
+
 /* Simple banner carousel */
 (function(){
     const banner = document.querySelector('.hero-banner');